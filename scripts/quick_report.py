@@ -18,7 +18,8 @@ def main() -> None:
 
     if summary["style_win_rates"]:
         print("Style win rates:")
-        for style, rate in sorted(summary["style_win_rates"].items(), key=lambda x: x[1], reverse=True):
+        # compute_metrics already orders styles by win rate.
+        for style, rate in summary["style_win_rates"].items():
             print(f"  {style}: {rate:.2%}")
     else:
         print("Style win rates: n/a")
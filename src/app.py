@@ -4,13 +4,16 @@ from __future__ import annotations
 
 import asyncio
 import html
-import json
-import uuid
+import logging
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any
+from secrets import token_hex
+from typing import Any, Literal
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, Field, ValidationError, field_validator
@@ -19,16 +22,25 @@ from .bandit import BanditManager, LinTS, LinUCB
 from .config import AppConfig, load_config
 from .features import FeatureExtractor
 from .generation import CandidateGenerator
+from .json_utils import JSONDecodeError
+from .json_utils import dumps as json_dumps
+from .json_utils import loads as json_loads
 from .logging_utils import JsonlInteractionLogger
 from .metrics import compute_metrics
-from .orchestrator import ConversationOrchestrator
+from .orchestrator import ConversationOrchestrator, TurnResult
 from .prompt_loader import PromptLoader
 from .types import GenerationContext, Message
 
+logger = logging.getLogger(__name__)
+
 CONFIG: AppConfig = load_config()
 BASE_DIR = Path(__file__).resolve().parent
 UI_DIR = BASE_DIR / "ui"
 templates = Jinja2Templates(directory=str(UI_DIR / "templates"))
+# Templates ship with the package, so skip Jinja's per-render freshness check.
+templates.env.auto_reload = False
+_INDEX_TEMPLATE = templates.get_template("index.html")
+_CANDIDATES_TEMPLATE = templates.get_template("partials/candidates.html")
 
 
 class TurnRequest(BaseModel):
@@ -43,18 +55,16 @@ class TurnRequest(BaseModel):
 
     @staticmethod
     def _parse_dict_field(value: Any, field_name: str) -> dict[str, Any] | None:
-        if value is None:
-            return None
+        if value is None or isinstance(value, dict):
+            return value
         if isinstance(value, str):
             trimmed = value.strip()
             if not trimmed:
                 return None
             try:
-                parsed = json.loads(trimmed)
-            except json.JSONDecodeError as exc:
+                parsed = json_loads(trimmed)
+            except JSONDecodeError as exc:
                 raise ValueError(f"{field_name}\u306f\u6709\u52b9\u306aJSON\u3092\u6307\u5b9a\u3057\u3066\u304f\u3060\u3055\u3044") from exc
-        elif isinstance(value, dict):
-            parsed = value
         else:
             raise TypeError(f"{field_name}\u306f\u8f9e\u66f8\u5f62\u5f0f\u3067\u6307\u5b9a\u3057\u3066\u304f\u3060\u3055\u3044")
         if not isinstance(parsed, dict):
@@ -66,35 +76,37 @@ class TurnRequest(BaseModel):
     def _coerce_utterance(cls, value: str | None) -> str:
         if value is None:
             raise ValueError('\u30e6\u30fc\u30b6\u767a\u8a71\u304c\u7a7a\u3067\u3059')
-        value = str(value).strip()
+        value = (value if isinstance(value, str) else str(value)).strip()
         if not value:
             raise ValueError('\u30e6\u30fc\u30b6\u767a\u8a71\u304c\u7a7a\u3067\u3059')
         return value
 
+    # Length limits live in the "before" validators so each field costs one
+    # Python call instead of a before/after pair.
     @field_validator('history', mode='before')
     @classmethod
     def _coerce_history(cls, value: str | list[str] | None) -> list[str]:
-        if value is None:
+        # JSON bodies almost always send a list of strings; pass it through as is.
+        if type(value) is list and all(type(item) is str for item in value):
+            items = value
+        elif value is None:
             return []
-        if isinstance(value, str):
-            return [line for line in value.splitlines() if line.strip()]
-        if isinstance(value, list):
-            return [str(item) for item in value]
-        raise TypeError('history\u306f\u6587\u5b57\u5217\u307e\u305f\u306f\u30ea\u30b9\u30c8\u3067\u6307\u5b9a\u3057\u3066\u304f\u3060\u3055\u3044')
-
-    @field_validator('history')
-    @classmethod
-    def _validate_history(cls, value: list[str]) -> list[str]:
-        if len(value) > 50:
+        elif isinstance(value, str):
+            items = [line for line in value.splitlines() if line.strip()]
+        elif isinstance(value, list):
+            items = [item if isinstance(item, str) else str(item) for item in value]
+        else:
+            raise TypeError('history\u306f\u6587\u5b57\u5217\u307e\u305f\u306f\u30ea\u30b9\u30c8\u3067\u6307\u5b9a\u3057\u3066\u304f\u3060\u3055\u3044')
+        if len(items) > 50:
             raise ValueError('history\u306f50\u4ef6\u307e\u3067\u306b\u3057\u3066\u304f\u3060\u3055\u3044')
-        return value
+        return items
 
     @field_validator('goal', mode='before')
     @classmethod
     def _coerce_goal(cls, value: str | None) -> str | None:
         if value is None:
             return None
-        text = str(value).strip()
+        text = (value if isinstance(value, str) else str(value)).strip()
         if not text:
             return None
         if len(text) > 500:
@@ -114,25 +126,24 @@ class TurnRequest(BaseModel):
     @field_validator('styles', mode='before')
     @classmethod
     def _coerce_styles(cls, value: Any) -> list[str] | None:
-        if value is None:
+        if type(value) is list:
+            stripped = ((part if type(part) is str else str(part)).strip() for part in value)
+            items = [part for part in stripped if part]
+        elif value is None:
             return None
-        if isinstance(value, str):
+        elif isinstance(value, str):
             items = [part.strip() for part in value.split(',') if part.strip()]
         elif isinstance(value, (list, tuple, set)):
-            items = [str(part).strip() for part in value if str(part).strip()]
+            stripped = ((part if isinstance(part, str) else str(part)).strip() for part in value)
+            items = [part for part in stripped if part]
         else:
             raise TypeError('styles\u306f\u6587\u5b57\u5217\u307e\u305f\u306f\u30ea\u30b9\u30c8\u3067\u6307\u5b9a\u3057\u3066\u304f\u3060\u3055\u3044')
         if not items:
             return None
         deduped = list(dict.fromkeys(items))
-        return deduped
-
-    @field_validator('styles')
-    @classmethod
-    def _validate_styles(cls, value: list[str] | None) -> list[str] | None:
-        if value and len(value) > 20:
+        if len(deduped) > 20:
             raise ValueError('styles\u306f20\u4ef6\u4ee5\u5185\u3067\u6307\u5b9a\u3057\u3066\u304f\u3060\u3055\u3044')
-        return value
+        return deduped
 
 
 
@@ -157,6 +168,23 @@ class FeedbackRequest(BaseModel):
     reward: float
 
 
+class BatchOp(BaseModel):
+    id: str
+    op: Literal["turn", "feedback"]
+    body: dict[str, Any]
+
+
+class BatchResult(BaseModel):
+    id: str
+    status: int
+    result: dict[str, Any] | None = None
+    error: str | None = None
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchResult]
+
+
 def _build_orchestrator() -> ConversationOrchestrator:
     config = CONFIG
     repo_root = Path(__file__).resolve().parent.parent
@@ -171,112 +199,281 @@ def _build_orchestrator() -> ConversationOrchestrator:
         policy = LinUCB()
 
     bandit_manager = BanditManager(policy)
-    logger = JsonlInteractionLogger(config.log_path)
+    interaction_logger = JsonlInteractionLogger(config.log_path)
     orchestrator = ConversationOrchestrator(
         prompt_loader,
         generator=generator,
         bandit_manager=bandit_manager,
         feature_extractor=feature_extractor,
-        logger=logger,
+        logger=interaction_logger,
         bandit_algo=config.bandit_algo,
     )
     return orchestrator
 
 
-app = FastAPI(title="Online Conversation Optimizer")
+# JSON routes declare a response type and keep the default response class, so
+# FastAPI serialises them straight to bytes with Pydantic's JSON encoder. A custom
+# default_response_class (e.g. ORJSONResponse) would turn that fast path off.
+# The orchestrator is built by the lifespan hook so that prompt loading and
+# logger setup happen off the import path; _get_orchestrator() builds it lazily
+# when the app runs without lifespan events (e.g. a bare TestClient).
+_orchestrator: ConversationOrchestrator | None = None
+_styles_catalog_sorted: tuple[str, ...] = ()
+
+
+def _install_orchestrator(orchestrator: ConversationOrchestrator) -> ConversationOrchestrator:
+    global _orchestrator, _styles_catalog_sorted
+
+    _styles_catalog_sorted = tuple(sorted(orchestrator.styles_catalog.keys()))
+    _orchestrator = orchestrator
+    return orchestrator
+
+
+def _get_orchestrator() -> ConversationOrchestrator:
+    if _orchestrator is None:
+        return _install_orchestrator(_build_orchestrator())
+    return _orchestrator
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    if _orchestrator is None:
+        _install_orchestrator(await asyncio.to_thread(_build_orchestrator))
+    yield
+
+
+app = FastAPI(title="Online Conversation Optimizer", lifespan=_lifespan)
 app.mount("/static", StaticFiles(directory=str(UI_DIR / "static")), name="static")
-_orchestrator = _build_orchestrator()
-_lock = asyncio.Lock()
+_DEFAULT_CANDIDATE_COUNT = CONFIG.candidate_count
+_STYLES_WHITELIST = CONFIG.styles_whitelist
+_DEFAULT_STYLES = tuple(_STYLES_WHITELIST or ())
+_SESSION_LOCK_LIMIT = 4096
+_BATCH_MAX_OPS = 256
+_BATCH_CONCURRENCY = 50
+_FORM_JSON_MAX_CHARS = 64_000
+_FEEDBACK_BATCH_SIZE = 64
+_session_locks: OrderedDict[str, _SessionLock] = OrderedDict()
+# Feedback waiting for the drainer task, which applies it in batches off the loop.
+_feedback_queue: deque[tuple[FeedbackRequest, asyncio.Future[None]]] = deque()
+_feedback_drainer: asyncio.Task[None] | None = None
+
+
+def _new_id() -> str:
+    """Return a random 128-bit identifier as 32 hex characters."""
+
+    return token_hex(16)
+
+
+class _SessionLock:
+    """Per-session lock plus the number of requests holding or awaiting it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+def _lock_for(session_id: str) -> _SessionLock:
+    """Return the lock entry serialising requests of one session.
+
+    Entries are kept in LRU order; once the table grows past
+    ``_SESSION_LOCK_LIMIT`` the oldest entry with no users is evicted, and
+    shared bandit state is guarded by ``BanditManager`` itself.
+    """
+
+    entry = _session_locks.get(session_id)
+    if entry is not None:
+        _session_locks.move_to_end(session_id)
+        return entry
+    entry = _session_locks[session_id] = _SessionLock()
+    if len(_session_locks) > _SESSION_LOCK_LIMIT:
+        for key, candidate in _session_locks.items():
+            if candidate.users == 0 and candidate is not entry:
+                del _session_locks[key]
+                break
+    return entry
+
+
+@asynccontextmanager
+async def _session_guard(session_id: str) -> AsyncIterator[None]:
+    entry = _lock_for(session_id)
+    # Counted before awaiting, so a queued request keeps its entry from eviction.
+    entry.users += 1
+    try:
+        async with entry.lock:
+            yield
+    finally:
+        entry.users -= 1
+
+
+_HISTORY_ROLES = ("user", "assistant")
 
 
 def _messages_from_history(history: list[str], user_utterance: str) -> list[Message]:
-    messages: list[Message] = []
-    role = "user"
-    for entry in history:
-        messages.append(Message(role=role, content=entry))
-        role = "assistant" if role == "user" else "user"
+    # History alternates user/assistant, starting with the user.
+    messages = [
+        Message(role=_HISTORY_ROLES[index & 1], content=entry)
+        for index, entry in enumerate(history)
+    ]
     messages.append(Message(role="user", content=user_utterance))
     return messages
 
 
-@app.post("/turn", response_model=TurnResponse)
-async def turn(request: TurnRequest) -> TurnResponse:
-    candidate_count = request.N or CONFIG.candidate_count
-    if candidate_count <= 0:
-        raise HTTPException(status_code=400, detail="Nは正の整数にしてください")
+async def _run_turn(request: TurnRequest, candidate_count: int, session: str) -> TurnResult:
+    """Build the generation context once and run the turn under the session lock."""
 
-    messages = _messages_from_history(request.history, request.user_utterance)
     context = GenerationContext(
-        messages=messages,
+        messages=_messages_from_history(request.history, request.user_utterance),
         candidate_count=candidate_count,
-        styles_allowed=request.styles or CONFIG.styles_whitelist,
+        styles_allowed=request.styles or _STYLES_WHITELIST,
         goal=request.goal,
         user_profile=request.user_profile,
         constraints=request.constraints,
     )
+    # Generation and bandit math are blocking; run them off the event loop.
+    orchestrator = _get_orchestrator()
+    async with _session_guard(session):
+        return await asyncio.to_thread(
+            orchestrator.run_turn, context, session_id=session, turn_id=_new_id()
+        )
+
+
+async def _handle_turn(request: TurnRequest) -> dict[str, Any]:
+    candidate_count = request.N or _DEFAULT_CANDIDATE_COUNT
+    if candidate_count <= 0:
+        raise HTTPException(status_code=400, detail="Nは正の整数にしてください")
+
     session_id = request.session_id.strip() if request.session_id else None
     if session_id and len(session_id) > 128:
         raise HTTPException(status_code=400, detail="session_idが長すぎます")
-    session = session_id or str(uuid.uuid4())
-    turn_id = str(uuid.uuid4())
+    result = await _run_turn(request, candidate_count, session_id or _new_id())
 
-    async with _lock:
-        result = _orchestrator.run_turn(context, session_id=session, turn_id=turn_id)
+    # Everything below comes from the orchestrator, so it is returned as a
+    # plain payload rather than re-validated through TurnResponse.
+    decision = result.decision
+    return {
+        "session_id": result.session_id,
+        "turn_id": result.turn_id,
+        "reply": result.chosen_candidate.text,
+        "chosen_idx": decision.chosen_index,
+        "propensity": decision.propensities[decision.chosen_index],
+        "debug": {
+            "scores": decision.scores,
+            "styles": [candidate.style for candidate in result.candidates],
+        },
+    }
 
-    chosen = result.chosen_candidate
-    debug = DebugInfo(
-        scores=result.decision.scores,
-        styles=[candidate.style for candidate in result.candidates],
-    )
 
-    return TurnResponse(
-        session_id=result.session_id,
-        turn_id=result.turn_id,
-        reply=chosen.text,
-        chosen_idx=result.decision.chosen_index,
-        propensity=result.decision.propensities[result.decision.chosen_index],
-        debug=debug,
-    )
+async def _submit_feedback(request: FeedbackRequest) -> None:
+    global _feedback_drainer
+
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future[None] = loop.create_future()
+    _feedback_queue.append((request, future))
+    drainer = _feedback_drainer
+    if drainer is None or drainer.done() or drainer.get_loop() is not loop:
+        _feedback_drainer = loop.create_task(_drain_feedback())
+    await future
+
+
+async def _drain_feedback() -> None:
+    # Yield once so feedback arriving in the same loop iteration joins the batch.
+    await asyncio.sleep(0)
+    orchestrator = _get_orchestrator()
+    while _feedback_queue:
+        count = min(len(_feedback_queue), _FEEDBACK_BATCH_SIZE)
+        batch = [_feedback_queue.popleft() for _ in range(count)]
+        items = [
+            (request.session_id, request.turn_id, request.chosen_idx, request.reward)
+            for request, _ in batch
+        ]
+        try:
+            errors = await asyncio.to_thread(orchestrator.apply_feedback_batch, items)
+        except Exception as exc:
+            errors = [exc] * len(batch)
+        for (_, future), error in zip(batch, errors):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+
+async def _handle_feedback(request: FeedbackRequest) -> dict[str, str]:
+    if request.reward < -1.0 or request.reward > 1.0:
+        raise HTTPException(status_code=400, detail="rewardは-1.0から1.0の範囲で指定してください")
+
+    try:
+        await _submit_feedback(request)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    return {"status": "ok"}
+
+
+@app.post("/turn", response_model=TurnResponse)
+async def turn(request: TurnRequest) -> Response:
+    # response_model documents the schema; the payload is encoded directly.
+    payload = await _handle_turn(request)
+    return Response(content=json_dumps(payload), media_type="application/json")
 
 
 @app.post("/feedback")
 async def feedback(request: FeedbackRequest) -> dict[str, str]:
-    if request.reward < -1.0 or request.reward > 1.0:
-        raise HTTPException(status_code=400, detail="rewardは-1.0から1.0の範囲で指定してください")
+    return await _handle_feedback(request)
 
-    async with _lock:
-        try:
-            _orchestrator.apply_feedback(
-                request.session_id,
-                request.turn_id,
-                request.chosen_idx,
-                request.reward,
-            )
-        except KeyError as exc:
-            raise HTTPException(status_code=404, detail=str(exc)) from exc
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    return {"status": "ok"}
+async def _run_batch_op(op: BatchOp, semaphore: asyncio.Semaphore) -> BatchResult:
+    async with semaphore:
+        try:
+            if op.op == "turn":
+                result: dict[str, Any] = await _handle_turn(TurnRequest.model_validate(op.body))
+            else:
+                result = await _handle_feedback(FeedbackRequest.model_validate(op.body))
+        except ValidationError as exc:
+            errors = exc.errors()
+            message = errors[0].get("msg", "入力値に誤りがあります。") if errors else "入力値に誤りがあります。"
+            return BatchResult(id=op.id, status=422, error=message)
+        except HTTPException as exc:
+            return BatchResult(id=op.id, status=exc.status_code, error=str(exc.detail))
+        except Exception:
+            # Sibling ops may already have been applied, so one failure must not
+            # turn the whole response into a 500 and hide their results.
+            logger.exception("batch op %s failed", op.id)
+            return BatchResult(id=op.id, status=500, error="内部エラーが発生しました")
+    return BatchResult(id=op.id, status=200, result=result)
+
+
+@app.post("/batch", response_model=BatchResponse)
+async def batch(ops: list[BatchOp]) -> BatchResponse:
+    if len(ops) > _BATCH_MAX_OPS:
+        raise HTTPException(status_code=400, detail=f"バッチは{_BATCH_MAX_OPS}件までにしてください")
+    semaphore = asyncio.Semaphore(_BATCH_CONCURRENCY)
+    results = await asyncio.gather(*(_run_batch_op(op, semaphore) for op in ops))
+    return BatchResponse(results=list(results))
 
 
 @app.get("/ui", response_class=HTMLResponse)
 async def ui(request: Request) -> HTMLResponse:
-    session_id = str(uuid.uuid4())
+    _get_orchestrator()  # loads the styles catalog on first use
+    session_id = _new_id()
     context = {
-        "request": request,
         "session_id": session_id,
         "history_json": "[]",
-        "candidate_count": CONFIG.candidate_count,
-        "styles_catalog": sorted(_orchestrator.styles_catalog.keys()),
-        "default_styles": CONFIG.styles_whitelist or [],
+        "candidate_count": _DEFAULT_CANDIDATE_COUNT,
+        "styles_catalog": _styles_catalog_sorted,
+        "default_styles": _DEFAULT_STYLES,
     }
-    return templates.TemplateResponse(request, "index.html", context)
+    return HTMLResponse(_INDEX_TEMPLATE.render(context))
 
 
 @app.get("/metrics")
 async def metrics() -> dict[str, object]:
-    return compute_metrics()
+    return await asyncio.to_thread(compute_metrics)
 
 
 @app.post("/api/turn", response_class=HTMLResponse)
@@ -287,11 +484,18 @@ async def api_turn(request: Request) -> HTMLResponse:
         return HTMLResponse("<div class='text-red-400 text-sm'>\u30e6\u30fc\u30b6\u767a\u8a71\u3092\u5165\u529b\u3057\u3066\u304f\u3060\u3055\u3044\u3002</div>", status_code=400)
 
     history_raw = form.get("history_json") or "[]"
+    user_profile_raw = form.get("user_profile")
+    constraints_raw = form.get("constraints")
+    # Reject oversized JSON fields before spending event-loop time decoding them.
+    for raw in (history_raw, user_profile_raw, constraints_raw):
+        if isinstance(raw, str) and len(raw) > _FORM_JSON_MAX_CHARS:
+            return HTMLResponse("<div class='text-red-400 text-sm'>入力データが大きすぎます。</div>", status_code=413)
+
     try:
-        history_data = json.loads(history_raw)
+        history_data = json_loads(history_raw)
         if not isinstance(history_data, list):
             history_data = []
-    except json.JSONDecodeError:
+    except JSONDecodeError:
         history_data = []
 
     session_id = (form.get("session_id") or "").strip() or None
@@ -304,9 +508,7 @@ async def api_turn(request: Request) -> HTMLResponse:
             return HTMLResponse("<div class='text-red-400 text-sm'>\u5019\u88dc\u6570\u306f\u6570\u5024\u3067\u6307\u5b9a\u3057\u3066\u304f\u3060\u3055\u3044\u3002</div>", status_code=400)
 
     goal_value = (form.get("goal") or "").strip()
-    user_profile_raw = form.get("user_profile")
-    constraints_raw = form.get("constraints")
-    styles_selected = form.getlist("styles") if hasattr(form, "getlist") else form.get("styles")
+    styles_selected = form.getlist("styles")
 
     payload = {
         "history": history_data,
@@ -326,59 +528,48 @@ async def api_turn(request: Request) -> HTMLResponse:
         escaped = html.escape(message)
         return HTMLResponse(f"<div class='text-red-400 text-sm'>{escaped}</div>", status_code=400)
 
-    candidate_count = turn_request.N or CONFIG.candidate_count
+    candidate_count = turn_request.N or _DEFAULT_CANDIDATE_COUNT
     if candidate_count <= 0:
         return HTMLResponse("<div class='text-red-400 text-sm'>N\u306f\u6b63\u306e\u6574\u6570\u306b\u3057\u3066\u304f\u3060\u3055\u3044\u3002</div>", status_code=400)
     if turn_request.session_id and len(turn_request.session_id) > 128:
         return HTMLResponse("<div class='text-red-400 text-sm'>session_id\u304c\u9577\u3059\u304e\u307e\u3059\u3002</div>", status_code=400)
 
-    messages = _messages_from_history(turn_request.history, turn_request.user_utterance)
-    context = GenerationContext(
-        messages=messages,
-        candidate_count=candidate_count,
-        styles_allowed=turn_request.styles or CONFIG.styles_whitelist,
-        goal=turn_request.goal,
-        user_profile=turn_request.user_profile,
-        constraints=turn_request.constraints,
-    )
-    session = turn_request.session_id.strip() if turn_request.session_id else str(uuid.uuid4())
-    turn_id = str(uuid.uuid4())
-
-    async with _lock:
-        result = _orchestrator.run_turn(context, session_id=session, turn_id=turn_id)
-
-    candidates_data = []
-    scores = list(result.decision.scores)
-    propensities = list(result.decision.propensities)
-    for idx, candidate in enumerate(result.candidates):
-        candidates_data.append(
-            {
-                "index": idx,
-                "text": candidate.text,
-                "style": candidate.style,
-                "score": float(scores[idx]),
-                "propensity": float(propensities[idx]),
-                "safety_score": candidate.features.get("safety_score"),
-                "features": candidate.features,
-                "session_id": result.session_id,
-                "turn_id": result.turn_id,
-            }
+    session = turn_request.session_id.strip() if turn_request.session_id else _new_id()
+    result = await _run_turn(turn_request, candidate_count, session)
+
+    # BanditManager already converted these to Python floats via tolist().
+    scores = result.decision.scores
+    propensities = result.decision.propensities
+    candidates_data = [
+        {
+            "index": idx,
+            "text": candidate.text,
+            "style": candidate.style,
+            "score": score,
+            "propensity": propensity,
+            "safety_score": candidate.features.get("safety_score"),
+            "features": candidate.features,
+            "session_id": result.session_id,
+            "turn_id": result.turn_id,
+        }
+        for idx, (candidate, score, propensity) in enumerate(
+            zip(result.candidates, scores, propensities)
         )
+    ]
 
     context = {
-        "request": request,
         "session_id": result.session_id,
         "turn_id": result.turn_id,
         "scores": scores,
         "propensities": propensities,
         "candidates": candidates_data,
     }
-    return templates.TemplateResponse(request, "partials/candidates.html", context)
+    return HTMLResponse(_CANDIDATES_TEMPLATE.render(context))
 
 
 @app.post("/api/feedback")
 async def api_feedback(request: Request) -> dict[str, object]:
-    payload = await request.json()
+    payload = json_loads(await request.body())
     data = {
         "session_id": payload.get("session_id"),
         "turn_id": payload.get("turn_id"),
@@ -389,22 +580,7 @@ async def api_feedback(request: Request) -> dict[str, object]:
     latency_ms = payload.get("latency_ms")
     continued = payload.get("continued")
 
-    if feedback_request.reward < -1.0 or feedback_request.reward > 1.0:
-        raise HTTPException(status_code=400, detail="rewardは-1.0から1.0の範囲で指定してください")
-
-    async with _lock:
-        try:
-            _orchestrator.apply_feedback(
-                feedback_request.session_id,
-                feedback_request.turn_id,
-                feedback_request.chosen_idx,
-                feedback_request.reward,
-            )
-        except KeyError as exc:
-            raise HTTPException(status_code=404, detail=str(exc)) from exc
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail=str(exc)) from exc
-
+    await _handle_feedback(feedback_request)
     return {"status": "ok", "latency_ms": latency_ms, "continued": continued}
 
 
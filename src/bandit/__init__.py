@@ -1,8 +1,9 @@
 """Bandit strategies available for the conversation optimizer."""
 
 from .base import Bandit
+from .linear import LinearBandit
 from .lints import LinTS
 from .linucb import LinUCB
 from .manager import BanditManager
 
-__all__ = ["Bandit", "LinUCB", "LinTS", "BanditManager"]
+__all__ = ["Bandit", "LinearBandit", "LinUCB", "LinTS", "BanditManager"]
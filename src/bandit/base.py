@@ -40,6 +40,20 @@ class Bandit(ABC):
     def update(self, phi: np.ndarray, reward: float, chosen_idx: int) -> None:
         """Update model parameters using full feature matrix and observed reward."""
 
+    def update_batch(self, chosen_features: np.ndarray, rewards: np.ndarray) -> None:
+        """Apply several observations at once.
+
+        ``chosen_features`` holds one row per observation: the feature vector of
+        the action that was taken. Subclasses may fuse the updates.
+        """
+
+        rows = ensure_2d(chosen_features)
+        values = ensure_1d(rewards)
+        if rows.shape[0] != values.shape[0]:
+            raise ValueError("chosen features and rewards must align on observation axis")
+        for row, reward in zip(rows, values):
+            self.update(row[np.newaxis, :], float(reward), 0)
+
     def propensity(self, scores: np.ndarray | None = None) -> float:
         """Return the softmax probability of the last chosen action."""
 
@@ -0,0 +1,113 @@
+"""Shared ridge-regression state for the linear contextual bandits."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .base import Bandit
+from .utils import ensure_1d, ensure_2d, get_env_float, inverse_cholesky, rank1_update
+
+# Recompute A^-1 from A after this many incremental updates to bound drift.
+_RESYNC_EVERY = 256
+# Sherman-Morrison denominators below this are treated as ill-conditioned.
+_MIN_DENOM = 1e-12
+
+
+class LinearBandit(Bandit):
+    """Keeps ``A = lambda * I + sum x x^T`` and ``b = sum r x`` for LinUCB/LinTS.
+
+    ``A^-1`` and ``theta = A^-1 b`` are maintained incrementally with
+    Sherman-Morrison, so neither selection nor a single update inverts ``A``.
+    """
+
+    def __init__(self, lam: float | None = None, beta: float | None = None) -> None:
+        super().__init__(beta=beta)
+        self._lambda = (
+            lam if lam is not None else get_env_float("BANDIT_LAMBDA", 1.0)
+        )
+        self._A: np.ndarray | None = None
+        self._b: np.ndarray | None = None
+        self._A_inv: np.ndarray | None = None
+        self._theta: np.ndarray | None = None
+        self._scratch: np.ndarray | None = None
+        self._updates_since_sync = 0
+
+    def update(self, phi: np.ndarray, reward: float, chosen_idx: int) -> None:
+        features = ensure_2d(phi)
+        dim = features.shape[1]
+        self._ensure_state(dim)
+        assert self._A is not None and self._A_inv is not None
+
+        if not self._incremental_update(features[chosen_idx], reward):
+            self._refresh()
+
+    def _incremental_update(self, x: np.ndarray, reward: float) -> bool:
+        """Fold one observation into ``A``, ``b`` and ``A^-1``.
+
+        Returns whether this triggered a resync; otherwise the caller still has
+        to refresh the derived values.
+        """
+
+        assert self._A is not None and self._A_inv is not None
+        rank1_update(self._A, self._b, x, reward, self._scratch)
+        v = self._A_inv @ x
+        denom = 1.0 + float(x @ v)
+        self._updates_since_sync += 1
+        if denom < _MIN_DENOM or self._updates_since_sync >= _RESYNC_EVERY:
+            self._resync()
+            return True
+        # (A + x x^T)^-1 = A^-1 - (A^-1 x)(A^-1 x)^T / (1 + x^T A^-1 x)
+        outer = np.multiply(v[:, np.newaxis], v / denom, out=self._scratch)
+        self._A_inv -= outer
+        return False
+
+    def update_batch(self, chosen_features: np.ndarray, rewards: np.ndarray) -> None:
+        rows = ensure_2d(chosen_features)
+        values = ensure_1d(rewards)
+        if rows.shape[0] != values.shape[0]:
+            raise ValueError("chosen features and rewards must align on observation axis")
+        dim = rows.shape[1]
+        self._ensure_state(dim)
+        assert self._A is not None and self._b is not None
+
+        if rows.shape[0] < dim:
+            # k Sherman-Morrison steps cost O(k d^2), below one O(d^3) resync;
+            # the drainer usually hands over just a few rows.
+            resynced = False
+            for x, reward in zip(rows, values):
+                resynced = self._incremental_update(x, float(reward))
+            if not resynced:
+                self._refresh()
+            return
+
+        # Sum of rank-1 outer products as a single matrix product.
+        self._A += rows.T @ rows
+        self._b += rows.T @ values
+        self._resync()
+
+    def _ensure_state(self, dim: int) -> None:
+        if self._A is None or self._b is None:
+            self._A = self._lambda * np.eye(dim)
+            self._b = np.zeros(dim)
+            self._A_inv = np.eye(dim) / self._lambda
+            self._theta = np.zeros(dim)
+            self._scratch = np.empty((dim, dim))
+            self._updates_since_sync = 0
+        elif self._A.shape[0] != dim:
+            raise ValueError(f"Feature dimension mismatch for {type(self).__name__}")
+
+    def _resync(self) -> np.ndarray:
+        """Recompute ``A^-1`` from ``A`` and return the ``L^-1`` factor used."""
+
+        assert self._A is not None
+        L_inv = inverse_cholesky(self._A)
+        self._A_inv = L_inv.T @ L_inv
+        self._updates_since_sync = 0
+        self._refresh()
+        return L_inv
+
+    def _refresh(self) -> None:
+        """Recompute values derived from ``A^-1`` and ``b``."""
+
+        assert self._A_inv is not None and self._b is not None
+        self._theta = self._A_inv @ self._b
@@ -4,11 +4,11 @@ from __future__ import annotations
 
 import numpy as np
 
-from .base import Bandit
-from .utils import ensure_2d, get_env_float
+from .linear import LinearBandit
+from .utils import get_env_float
 
 
-class LinTS(Bandit):
+class LinTS(LinearBandit):
     """Posterior sampling for linear contextual bandits."""
 
     def __init__(
@@ -18,49 +18,49 @@ class LinTS(Bandit):
         beta: float | None = None,
         random_state: int | None = None,
     ) -> None:
-        super().__init__(beta=beta)
+        super().__init__(lam=lam, beta=beta)
         self._sigma2 = (
             sigma2
             if sigma2 is not None
             else get_env_float("LINTS_SIGMA2", 0.5)
         )
-        self._lambda = (
-            lam if lam is not None else get_env_float("BANDIT_LAMBDA", 1.0)
-        )
         self._rng = np.random.default_rng(random_state)
-        self._A: np.ndarray | None = None
-        self._b: np.ndarray | None = None
+        # Cholesky factor of A^-1, computed on demand after each update.
+        self._C: np.ndarray | None = None
 
     def _select_impl(
         self, prior_scores: np.ndarray, features: np.ndarray
     ) -> tuple[int, np.ndarray]:
-        features = ensure_2d(features)
+        # Bandit.select has already validated and densified both arrays.
         dim = features.shape[1]
         self._ensure_state(dim)
-        assert self._A is not None and self._b is not None
+        assert self._theta is not None
 
-        A_inv = np.linalg.inv(self._A)
-        theta_bar = A_inv @ self._b
-        cov = (self._sigma2) * A_inv
-        theta_sample = self._rng.multivariate_normal(theta_bar, cov)
+        # With A^-1 = C C^T, theta_bar + sqrt(sigma2) * C z is a posterior draw.
+        z = self._rng.standard_normal(dim)
+        theta_sample = self._theta + np.sqrt(self._sigma2) * (self._cov_factor() @ z)
         scores = prior_scores + features @ theta_sample
-        chosen = int(np.argmax(scores))
+        chosen = int(scores.argmax())
         return chosen, scores
 
-    def update(self, phi: np.ndarray, reward: float, chosen_idx: int) -> None:
-        features = ensure_2d(phi)
-        dim = features.shape[1]
-        self._ensure_state(dim)
-        assert self._A is not None and self._b is not None
-
-        x = features[chosen_idx]
-        self._A += np.outer(x, x)
-        self._b += reward * x
+    def _cov_factor(self) -> np.ndarray:
+        if self._C is None:
+            assert self._A_inv is not None
+            try:
+                self._C = np.linalg.cholesky(self._A_inv)
+            except np.linalg.LinAlgError:
+                # Sherman-Morrison roundoff can leave A^-1 slightly indefinite;
+                # rebuilding it from A also yields a factor.
+                self._resync()
+        assert self._C is not None
+        return self._C
 
-    def _ensure_state(self, dim: int) -> None:
-        if self._A is None or self._b is None:
-            self._A = self._lambda * np.eye(dim)
-            self._b = np.zeros(dim)
-        elif self._A.shape[0] != dim:
-            raise ValueError("Feature dimension mismatch for LinTS")
+    def _resync(self) -> np.ndarray:
+        L_inv = super()._resync()
+        # A^-1 = L^-T L^-1, so L^-T is already a valid factor of it.
+        self._C = L_inv.T
+        return L_inv
 
+    def _refresh(self) -> None:
+        super()._refresh()
+        self._C = None
@@ -4,11 +4,11 @@ from __future__ import annotations
 
 import numpy as np
 
-from .base import Bandit
-from .utils import ensure_2d, get_env_float
+from .linear import LinearBandit
+from .utils import get_env_float
 
 
-class LinUCB(Bandit):
+class LinUCB(LinearBandit):
     """Linear UCB with shared parameter vector."""
 
     def __init__(
@@ -17,48 +17,30 @@ class LinUCB(Bandit):
         lam: float | None = None,
         beta: float | None = None,
     ) -> None:
-        super().__init__(beta=beta)
+        super().__init__(lam=lam, beta=beta)
         self._alpha = (
             alpha
             if alpha is not None
             else get_env_float("LINUCB_ALPHA", 0.6)
         )
-        self._lambda = (
-            lam if lam is not None else get_env_float("BANDIT_LAMBDA", 1.0)
-        )
-        self._A: np.ndarray | None = None
-        self._b: np.ndarray | None = None
 
     def _select_impl(
         self, prior_scores: np.ndarray, features: np.ndarray
     ) -> tuple[int, np.ndarray]:
-        features = ensure_2d(features)
+        # Bandit.select has already validated and densified both arrays.
         dim = features.shape[1]
         self._ensure_state(dim)
-        assert self._A is not None and self._b is not None
-
-        A_inv = np.linalg.inv(self._A)
-        theta = A_inv @ self._b
-        means = features @ theta
-        uncertainties = np.sqrt(np.sum(features @ A_inv * features, axis=1))
-        scores = prior_scores + means + self._alpha * uncertainties
-        chosen = int(np.argmax(scores))
+        assert self._A_inv is not None and self._theta is not None
+
+        projected = features @ self._A_inv
+        bonus = np.einsum("ij,ij->i", projected, features)
+        # Clamp round-off so the incremental inverse never yields sqrt(<0),
+        # then build the scores in place: prior + theta.x + alpha * sqrt(x^T A^-1 x).
+        np.maximum(bonus, 0.0, out=bonus)
+        np.sqrt(bonus, out=bonus)
+        bonus *= self._alpha
+        scores = features @ self._theta
+        scores += prior_scores
+        scores += bonus
+        chosen = int(scores.argmax())
         return chosen, scores
-
-    def update(self, phi: np.ndarray, reward: float, chosen_idx: int) -> None:
-        features = ensure_2d(phi)
-        dim = features.shape[1]
-        self._ensure_state(dim)
-        assert self._A is not None and self._b is not None
-
-        x = features[chosen_idx]
-        self._A += np.outer(x, x)
-        self._b += reward * x
-
-    def _ensure_state(self, dim: int) -> None:
-        if self._A is None or self._b is None:
-            self._A = self._lambda * np.eye(dim)
-            self._b = np.zeros(dim)
-        elif self._A.shape[0] != dim:
-            raise ValueError("Feature dimension mismatch for LinUCB")
-
@@ -2,31 +2,59 @@
 
 from __future__ import annotations
 
+import threading
+
 import numpy as np
 
 from ..types import BanditDecision
 from .base import Bandit
-from .utils import softmax
+from .utils import softmax, softmax_small
+
+# Below this many actions the pure-Python softmax beats NumPy dispatch.
+_SMALL_SOFTMAX_MAX = 16
 
 
 class BanditManager:
-    """Wrapper that exposes a friendly decision object."""
+    """Wrapper that exposes a friendly decision object.
+
+    The wrapped policy is shared by every session, so selection and updates
+    are serialised with a lock.
+    """
 
     def __init__(self, policy: Bandit) -> None:
         self._policy = policy
+        self._lock = threading.Lock()
+        # (scores, propensities) of the previous turn; retries of an unchanged
+        # turn reproduce the same scores and reuse the softmax.
+        self._last_softmax: tuple[list[float], list[float]] | None = None
 
     def select(self, scores: np.ndarray, phi: np.ndarray) -> BanditDecision:
-        idx = self._policy.select(scores, phi)
-        combined_scores = self._policy.last_scores
-        probs = softmax(combined_scores, beta=self._policy.temperature)
+        with self._lock:
+            idx = self._policy.select(scores, phi)
+            combined_scores = self._policy.last_scores
+        scores_list = combined_scores.tolist()
+        cached = self._last_softmax
+        if cached is not None and cached[0] == scores_list:
+            propensities = list(cached[1])
+        else:
+            if len(scores_list) <= _SMALL_SOFTMAX_MAX:
+                propensities = softmax_small(scores_list, self._policy.temperature)
+            else:
+                propensities = softmax(combined_scores, beta=self._policy.temperature).tolist()
+            self._last_softmax = (scores_list, propensities)
         decision = BanditDecision(
             chosen_index=idx,
-            propensities=probs.tolist(),
-            scores=combined_scores.tolist(),
+            propensities=propensities,
+            scores=scores_list,
         )
         return decision
 
     def update(self, phi: np.ndarray, reward: float, chosen_idx: int | None = None) -> None:
-        if chosen_idx is None:
-            chosen_idx = self._policy.last_index
-        self._policy.update(phi, reward, chosen_idx)
+        with self._lock:
+            if chosen_idx is None:
+                chosen_idx = self._policy.last_index
+            self._policy.update(phi, reward, chosen_idx)
+
+    def update_batch(self, chosen_features: np.ndarray, rewards: np.ndarray) -> None:
+        with self._lock:
+            self._policy.update_batch(chosen_features, rewards)
@@ -3,12 +3,18 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import math
 import os
+from collections.abc import Sequence
 from typing import Any
 
 import numpy as np
 
+from ..json_utils import dumps
+
+# exp(x) rounds to 0.0 in float64 for x below this.
+_EXP_UNDERFLOW = -745.2
+
 
 def get_env_float(name: str, default: float) -> float:
     """Parse an environment variable as float with fallback."""
@@ -31,10 +37,40 @@ def ensure_1d(array: np.ndarray) -> np.ndarray:
 def ensure_2d(array: np.ndarray) -> np.ndarray:
     """Return a contiguous 2-D float64 array."""
 
-    arr = np.asarray(array, dtype=float)
+    # One conversion call; ascontiguousarray only promotes 0-d input to 1-d,
+    # which the ndim check still rejects.
+    arr = np.ascontiguousarray(array, dtype=float)
     if arr.ndim != 2:
         raise ValueError("Expected 2-D array")
-    return np.ascontiguousarray(arr, dtype=float)
+    return arr
+
+
+def rank1_update(
+    A: np.ndarray,
+    b: np.ndarray,
+    x: np.ndarray,
+    reward: float,
+    scratch: np.ndarray | None = None,
+) -> None:
+    """Apply ``A += x x^T`` and ``b += reward * x`` in place.
+
+    ``scratch`` is an optional ``A``-shaped buffer reused for the outer product.
+    """
+
+    outer = np.multiply(x[:, np.newaxis], x, out=scratch)
+    np.add(A, outer, out=A)
+    b += reward * x
+
+
+def inverse_cholesky(matrix: np.ndarray) -> np.ndarray:
+    """Return ``L^-1`` for the lower Cholesky factor ``L`` of an SPD matrix.
+
+    ``matrix^-1 == L^-1.T @ L^-1``, so quadratic forms and solves against the
+    matrix reduce to products with this triangular factor.
+    """
+
+    lower = np.linalg.cholesky(matrix)
+    return np.linalg.solve(lower, np.eye(lower.shape[0]))
 
 
 def softmax(scores: np.ndarray, beta: float | None = None) -> np.ndarray:
@@ -43,18 +79,50 @@ def softmax(scores: np.ndarray, beta: float | None = None) -> np.ndarray:
     scores = ensure_1d(scores)
     if beta is None:
         beta = get_env_float("SOFTMAX_BETA", 1.0)
-    scaled = scores * float(beta)
+    if scores.size == 1:
+        return np.ones(1)
+    # Every step below reuses the one scaled buffer; the default beta of 1.0
+    # only needs a copy instead of a multiply.
+    beta = float(beta)
+    scaled = scores.copy() if beta == 1.0 else scores * beta
     scaled -= np.max(scaled)
-    exps = np.exp(scaled)
-    total = np.sum(exps)
+    # When every other action sits past exp's underflow point the result is
+    # exactly one-hot, so skip the exp/sum/divide.
+    live = scaled > _EXP_UNDERFLOW
+    if np.count_nonzero(live) == 1:
+        return live.astype(float)
+    np.exp(scaled, out=scaled)
+    total = np.sum(scaled)
     if not np.isfinite(total) or total <= 0.0:
-        return np.ones_like(scores) / scores.size
-    return exps / total
+        scaled.fill(1.0 / scores.size)
+        return scaled
+    scaled /= total
+    return scaled
+
+
+def softmax_small(scores: Sequence[float], beta: float) -> list[float]:
+    """Pure-Python :func:`softmax` for a handful of scores.
+
+    For the few candidates of a turn, NumPy dispatch costs more than the math;
+    this runs the max, exp, sum and divide in one Python loop instead.
+    """
+
+    scaled = list(scores) if beta == 1.0 else [score * beta for score in scores]
+    peak = max(scaled)
+    exps = [math.exp(value - peak) for value in scaled]
+    total = math.fsum(exps)
+    if not math.isfinite(total) or total <= 0.0:
+        return [1.0 / len(scaled)] * len(scaled)
+    return [value / total for value in exps]
 
 
 def context_hash(payload: Any) -> str:
-    """Create a deterministic hash for a JSON-serialisable payload."""
+    """Create a deterministic 128-bit key for a JSON-serialisable payload.
+
+    This is a cache/dedup key, not a security boundary, so BLAKE2b with a
+    16-byte digest is used over compact sorted-key JSON.
+    """
 
-    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
-    return hashlib.sha256(encoded).hexdigest()
+    encoded = dumps(payload, sort_keys=True)
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
 
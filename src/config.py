@@ -3,22 +3,28 @@
 from __future__ import annotations
 
 import os
+import re
 from dataclasses import dataclass, field
 from pathlib import Path
 
+# One ``KEY=value`` assignment per line; blank lines, comments and lines
+# without ``=`` simply do not match.
+_ENV_LINE = re.compile(r"^[ \t]*([^#=\s][^=\r\n]*?)[ \t]*=[ \t]*(.*?)[ \t\r]*$", re.MULTILINE)
+_env_loaded = False
+
 
 def _ensure_env_loaded() -> None:
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
     env_path = Path(__file__).resolve().parent.parent / ".env"
     if not env_path.exists():
         return
-    for line in env_path.read_text(encoding="utf-8").splitlines():
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#") or "=" not in stripped:
-            continue
-        key, value = stripped.split("=", 1)
-        key = key.strip()
-        value = value.strip().strip('"').strip("'")
-        os.environ.setdefault(key, value)
+    text = env_path.read_text(encoding="utf-8")
+    for match in _ENV_LINE.finditer(text):
+        key, value = match.groups()
+        os.environ.setdefault(key, value.strip('"').strip("'"))
 
 
 def _split_list(value: str | None) -> list[str] | None:
@@ -28,7 +34,7 @@ def _split_list(value: str | None) -> list[str] | None:
     return items or None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AppConfig:
     """Runtime configuration sourced from environment variables."""
 
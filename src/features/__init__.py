@@ -1,6 +1,6 @@
 """Feature extraction utilities package."""
 
-from .extractor import FeatureExtractor
+from .extractor import FEATURE_NAMES, FeatureExtractor
 
-__all__ = ["FeatureExtractor"]
+__all__ = ["FEATURE_NAMES", "FeatureExtractor"]
 
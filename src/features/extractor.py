@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 from collections.abc import Iterable, Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+import numpy as np
 
 from ..types import Candidate, GenerationContext, Message
 
@@ -19,39 +21,68 @@ def _clip(value: float, min_value: float, max_value: float) -> float:
     return max(min_value, min(max_value, value))
 
 
+def _style_vector(style_meta: dict[str, object]) -> tuple[float, float]:
+    initiative = float(style_meta.get("initiative", 0.5))
+    risk = float(style_meta.get("risk", 0.2))
+    return _clip(initiative, 0.0, 1.0), _clip(risk, 0.0, 1.0)
+
+
+FEATURE_NAMES = (
+    "bias",
+    "ctx_len",
+    "last_user_chars",
+    "candidate_words",
+    "candidate_question",
+    "style_initiative",
+    "style_risk",
+)
+_DEFAULT_STYLE_FEATURES = _style_vector({})
+_WORDS_SCALE = 80.0
+# words / _WORDS_SCALE is clipped at 2.0, so counting beyond this is wasted.
+_MAX_WORDS = 160
+
+
 @dataclass
 class FeatureExtractor:
     """Compute feature vectors used by the contextual bandit."""
 
     styles_catalog: dict[str, dict[str, object]]
+    _style_features: dict[str, tuple[float, float]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Style metadata is static, so clip and coerce it once per style.
+        self._style_features = {
+            name: _style_vector(meta) for name, meta in self.styles_catalog.items()
+        }
 
     def build_features(
         self, context: GenerationContext, candidates: Iterable[Candidate]
-    ) -> tuple[list[list[float]], list[dict[str, float]]]:
-        """Return numeric features and a friendly mapping for logging."""
+    ) -> tuple[np.ndarray, list[dict[str, float]]]:
+        """Return the ``(n_candidates, 7)`` feature matrix and a mapping for logging."""
 
         base_features = self._context_features(context)
-        vectors: list[list[float]] = []
-        dense_mappings: list[dict[str, float]] = []
-
-        for candidate in candidates:
-            style_meta = self.styles_catalog.get(candidate.style, {})
-            vec = list(base_features)
-            vec.extend(self._candidate_features(candidate, style_meta))
-            vectors.append(vec)
-            dense_mappings.append(
-                {
-                    "bias": 1.0,
-                    "ctx_len": base_features[1],
-                    "last_user_chars": base_features[2],
-                    "candidate_words": vec[3],
-                    "candidate_question": vec[4],
-                    "style_initiative": vec[5],
-                    "style_risk": vec[6],
-                }
-            )
-
-        return vectors, dense_mappings
+        rows = [self._candidate_features(candidate) for candidate in candidates]
+        matrix = np.empty((len(rows), len(base_features) + 4), dtype=np.float64)
+        matrix[:, :3] = base_features
+        if rows:
+            matrix[:, 3:] = rows
+
+        ctx_len = base_features[1]
+        last_user_chars = base_features[2]
+        dense_mappings = [
+            {
+                "bias": 1.0,
+                "ctx_len": ctx_len,
+                "last_user_chars": last_user_chars,
+                "candidate_words": words,
+                "candidate_question": question,
+                "style_initiative": initiative,
+                "style_risk": risk,
+            }
+            for words, question, initiative, risk in rows
+        ]
+
+        return matrix, dense_mappings
 
     def _context_features(self, context: GenerationContext) -> list[float]:
         messages = context.messages
@@ -65,18 +96,9 @@ class FeatureExtractor:
             _clip(last_len / 400.0, 0.0, 1.5),
         ]
 
-    def _candidate_features(
-        self, candidate: Candidate, style_meta: dict[str, object]
-    ) -> list[float]:
-        words = len(candidate.text.split())
+    def _candidate_features(self, candidate: Candidate) -> tuple[float, float, float, float]:
+        # The feature saturates at _MAX_WORDS, so stop splitting past that point.
+        words = len(candidate.text.split(None, _MAX_WORDS))
         question = 1.0 if "?" in candidate.text else 0.0
-        initiative = float(style_meta.get("initiative", 0.5))
-        risk = float(style_meta.get("risk", 0.2))
-
-        return [
-            _clip(words / 80.0, 0.0, 2.0),
-            question,
-            _clip(initiative, 0.0, 1.0),
-            _clip(risk, 0.0, 1.0),
-        ]
-
+        initiative, risk = self._style_features.get(candidate.style, _DEFAULT_STYLE_FEATURES)
+        return _clip(words / _WORDS_SCALE, 0.0, 2.0), question, initiative, risk
@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import functools
 import json
 import logging
 import os
 import re
+import threading
+from collections import OrderedDict, deque
 from collections.abc import Iterable, Sequence
 from pathlib import Path
+from typing import Any
 
+from ..json_utils import JSONDecodeError, dumps, loads
 from ..prompt_loader import PromptLoader
 from ..types import Candidate, GenerationContext, Message
 
@@ -44,6 +49,30 @@ def _compose_system_prompt(loader: PromptLoader) -> str:
     return "\n\n".join(parts)
 
 
+@functools.lru_cache(maxsize=8)
+def _prompt_assets(root: Path) -> tuple[str, dict]:
+    """Return the composed system prompt and styles catalog under ``root``."""
+
+    loader = PromptLoader(root)
+    return _compose_system_prompt(loader).strip(), _load_styles_catalog(loader)
+
+
+def _candidates_from(parsed: object) -> list | None:
+    if isinstance(parsed, list):
+        return parsed
+    if isinstance(parsed, dict):
+        for key in ("candidates", "outputs", "choices", "data"):
+            value = parsed.get(key)
+            if isinstance(value, list):
+                return value
+            if isinstance(value, str):
+                try:
+                    decoded = loads(value)
+                except JSONDecodeError:
+                    continue
+                if isinstance(decoded, list):
+                    return decoded
+    return None
 
 
 def _parse_candidates_payload(raw: str) -> list[dict]:
@@ -51,16 +80,22 @@ def _parse_candidates_payload(raw: str) -> list[dict]:
     if not raw:
         raise ValueError("empty payload")
 
+    # Well-formed replies are a bare JSON document; only fall back to scanning
+    # for an embedded array or object when the whole string does not parse.
+    try:
+        candidates = _candidates_from(loads(raw))
+    except JSONDecodeError:
+        candidates = None
+    if candidates is not None:
+        return candidates
+
     decoder = json.JSONDecoder()
-    snippets: list[str] = []
-    for candidate in (raw, raw.lstrip()):
-        if candidate and candidate not in snippets:
-            snippets.append(candidate)
+    snippets: list[str] = [raw]
     for token in ("[", "{"):
         idx = raw.find(token)
-        if idx != -1:
+        if idx > 0:
             snippet = raw[idx:]
-            if snippet and snippet not in snippets:
+            if snippet not in snippets:
                 snippets.append(snippet)
 
     for snippet in snippets:
@@ -68,43 +103,89 @@ def _parse_candidates_payload(raw: str) -> list[dict]:
             parsed, _ = decoder.raw_decode(snippet)
         except json.JSONDecodeError:
             continue
-        if isinstance(parsed, list):
-            return parsed
-        if isinstance(parsed, dict):
-            for key in ("candidates", "outputs", "choices", "data"):
-                value = parsed.get(key)
-                if isinstance(value, list):
-                    return value
-                if isinstance(value, str):
-                    try:
-                        decoded = json.loads(value)
-                    except json.JSONDecodeError:
-                        continue
-                    if isinstance(decoded, list):
-                        return decoded
+        candidates = _candidates_from(parsed)
+        if candidates is not None:
+            return candidates
     raise ValueError("could not parse candidates from payload")
 
+
+_FENCE_HEAD = re.compile(r"^```[a-zA-Z]*\s*")
+_FENCE_TAIL = re.compile(r"\s*```$")
+_JA_CHARS = re.compile("[\u3040-\u30ff\u4e00-\u9fff]")
+_EN_CHARS = re.compile("[A-Za-z]")
+
+
 def _detect_language(text: str) -> str:
-    if re.search("[\u3040-\u30ff\u4e00-\u9fff]", text):
+    # str.isascii() reads a flag on the string object, so pure-ASCII input can
+    # skip the kana/kanji scan entirely.
+    if not text.isascii() and _JA_CHARS.search(text):
         return "ja"
-    if re.search("[A-Za-z]", text):
+    if _EN_CHARS.search(text):
         return "en"
     return "ja"
 
 
-def _build_features(text: str, style: str, style_meta: dict, language: str) -> dict:
+def _style_floats(style_meta: dict) -> tuple[float, float]:
+    return float(style_meta.get("initiative", 0.5)), float(style_meta.get("risk", 0.2))
+
+
+_DEFAULT_STYLE_FLOATS = _style_floats({})
+
+
+def _build_features(
+    text: str, style: str, style_floats: tuple[float, float], language: str
+) -> dict:
+    initiative, risk = style_floats
     words = text.split()
     return {
         "length_chars": len(text),
         "length_words": len(words),
         "is_question": text.strip().endswith("?"),
         "language": language,
-        "style_initiative": float(style_meta.get("initiative", 0.5)),
-        "style_risk": float(style_meta.get("risk", 0.2)),
+        "style_initiative": initiative,
+        "style_risk": risk,
         "style": style,
     }
 
 
+_STATIC_FALLBACKS: dict[str, dict[str, str]] = {
+    "coach": {
+        "en": "Picture the progress you want this week. What's one move you can commit to?",
+        "ja": "今週進めたい形は？ 直近でやれる一手を一緒に決めよう。",
+    },
+    "playful": {
+        "en": "If this were a game, your move would set the tone—want to try a tiny bold experiment?",
+        "ja": "ゲーム感覚でいこう！次の一手で雰囲気が決まるよ。小さな実験、試してみない？",
+    },
+    "concise_expert": {
+        "en": "Focus on the single lever with the biggest upside and schedule a quick review after acting.",
+        "ja": "一番リターンの高いレバーに絞って動こう。実行後すぐにセルフレビューを。",
+    },
+}
+# Fallbacks that quote the user: (prefix, snippet length, trailing punctuation
+# stripped from the snippet, suffix). Unknown styles use the empathetic one.
+_ECHO_FALLBACKS: dict[str, dict[str, tuple[str, int, str, str]]] = {
+    "empathetic": {
+        "en": (
+            "I hear how that feels: ",
+            120,
+            ".",
+            ". Would one small step today help you steady things?",
+        ),
+        "ja": ("気持ち、伝わってきました：", 60, "。", "。まず一歩、どんな行動が安心につながりそう？"),
+    },
+    "logical": {
+        "en": (
+            "Let's map it quickly. Core issue: ",
+            80,
+            ".",
+            ". Next, pick one actionable constraint to test.",
+        ),
+        "ja": ("論点を整理しよう。焦点は", 40, "。", "。次に試せる制約をひとつ選ぼう。"),
+    },
+}
+
+
 class CandidateGenerator:
     """Generate candidate replies by calling OpenAI or using deterministic fallback."""
 
@@ -114,37 +195,61 @@ class CandidateGenerator:
         model: str = DEFAULT_MODEL_NAME,
         temperature: float = 0.8,
         max_output_tokens: int = 600,
+        completion_cache_size: int = 512,
     ) -> None:
         self._loader = prompt_loader or PromptLoader(PROMPTS_DIR)
         self._model = model
         self._temperature = temperature
         self._max_output_tokens = max_output_tokens
-        composed_prompt = _compose_system_prompt(self._loader).strip()
+        # Raw completions keyed by the request payload, in LRU order; the model
+        # settings and system prompt are fixed per instance so they need no key.
+        self._completion_cache_size = completion_cache_size
+        self._completion_cache: OrderedDict[str, str] = OrderedDict()
+        self._completion_lock = threading.Lock()
+        if type(self._loader) is PromptLoader:
+            # Prompt files are static, so generators on the same directory share
+            # one read and parse; subclassed loaders keep their own behaviour.
+            composed_prompt, styles_catalog = _prompt_assets(self._loader.root.resolve())
+            styles_catalog = dict(styles_catalog)
+        else:
+            composed_prompt = _compose_system_prompt(self._loader).strip()
+            styles_catalog = _load_styles_catalog(self._loader)
         self._system_prompt = composed_prompt or DEFAULT_SYSTEM_PROMPT
-        self._styles_catalog = _load_styles_catalog(self._loader)
+        self._styles_catalog = styles_catalog
+        # Catalog metadata is static; coerce each style's numbers once.
+        self._style_floats = {
+            name: _style_floats(meta) for name, meta in styles_catalog.items()
+        }
 
     @property
     def styles_catalog(self) -> dict:
         return self._styles_catalog
 
-    def generate(self, context: GenerationContext) -> list[Candidate]:
+    def generate(
+        self, context: GenerationContext, *, use_cache: bool = True
+    ) -> list[Candidate]:
+        """Return candidates for ``context``.
+
+        ``use_cache=False`` always requests a new completion, for callers that
+        rejected the previous batch and need different replies.
+        """
+
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key:
             try:
-                return self._generate_via_openai(context, api_key)
+                return self._generate_via_openai(context, api_key, use_cache=use_cache)
             except Exception as exc:
                 logger.exception("LLM generation failed; falling back", exc_info=exc)
         return self._generate_fallback(context)
 
     def _generate_via_openai(
-        self, context: GenerationContext, api_key: str
+        self, context: GenerationContext, api_key: str, *, use_cache: bool = True
     ) -> list[Candidate]:
         try:
             from openai import OpenAI
         except ImportError as exc:
             raise RuntimeError("openai package is required for LLM generation") from exc
 
-        client = OpenAI(api_key=api_key)
         history_str = self._format_history(context.messages)
         payload = {
             "history": history_str,
@@ -155,10 +260,35 @@ class CandidateGenerator:
             or list(self._styles_catalog.keys()),
             "N": context.candidate_count,
         }
+        user_content = dumps(payload).decode("utf-8")
+        raw = self._cached_completion(user_content) if use_cache else None
+        if raw is None:
+            raw = self._request_completion(OpenAI(api_key=api_key), user_content)
+        try:
+            parsed = _parse_candidates_payload(raw)
+        except ValueError as exc:
+            logger.error("LLM response not valid JSON: %s", raw)
+            raise RuntimeError("LLM response was not valid JSON") from exc
+        candidates: list[Candidate] = []
+        language = self._infer_language(context.messages)
+        for item in parsed:
+            style = item.get("style", "unknown")
+            features = item.get("features") or item.get("meta") or {}
+            text = item.get("text", "")
+            style_floats = self._style_floats.get(style, _DEFAULT_STYLE_FLOATS)
+            merged_features = _build_features(text, style, style_floats, language)
+            merged_features.update(features)
+            candidates.append(Candidate(text=text, style=style, features=merged_features))
 
+        if not candidates:
+            return self._generate_fallback(context)
+        self._store_completion(user_content, raw)
+        return candidates[: context.candidate_count]
+
+    def _request_completion(self, client: Any, user_content: str) -> str:
         messages = [
             {"role": "system", "content": self._system_prompt},
-            {"role": "user", "content": json.dumps(payload, ensure_ascii=False)},
+            {"role": "user", "content": user_content},
         ]
         completion = client.chat.completions.create(
             model=self._model,
@@ -186,87 +316,57 @@ class CandidateGenerator:
 
         raw = "\n".join(text_fragments).strip()
         if raw.startswith("```"):
-            raw = re.sub(r"^```[a-zA-Z]*\s*", "", raw)
-            raw = re.sub(r"\s*```$", "", raw)
-        try:
-            parsed = _parse_candidates_payload(raw)
-        except ValueError as exc:
-            logger.error("LLM response not valid JSON: %s", raw)
-            raise RuntimeError("LLM response was not valid JSON") from exc
-        candidates: list[Candidate] = []
-        language = self._infer_language(context.messages)
-        for item in parsed:
-            style = item.get("style", "unknown")
-            features = item.get("features") or item.get("meta") or {}
-            text = item.get("text", "")
-            style_meta = self._styles_catalog.get(style, {})
-            merged_features = {
-                **_build_features(text, style, style_meta, language),
-                **features,
-            }
-            candidates.append(Candidate(text=text, style=style, features=merged_features))
-
-        if not candidates:
-            return self._generate_fallback(context)
-        return candidates[: context.candidate_count]
+            raw = _FENCE_HEAD.sub("", raw)
+            raw = _FENCE_TAIL.sub("", raw)
+        return raw
+
+    def _cached_completion(self, user_content: str) -> str | None:
+        with self._completion_lock:
+            raw = self._completion_cache.get(user_content)
+            if raw is not None:
+                self._completion_cache.move_to_end(user_content)
+            return raw
+
+    def _store_completion(self, user_content: str, raw: str) -> None:
+        # Only completions that produced candidates are kept, so a malformed
+        # reply is retried on the next identical request.
+        if self._completion_cache_size <= 0:
+            return
+        with self._completion_lock:
+            self._completion_cache[user_content] = raw
+            self._completion_cache.move_to_end(user_content)
+            while len(self._completion_cache) > self._completion_cache_size:
+                self._completion_cache.popitem(last=False)
 
     def _generate_fallback(self, context: GenerationContext) -> list[Candidate]:
         styles = context.styles_allowed or list(self._styles_catalog.keys())
         if not styles:
             styles = ["empathetic", "logical", "coach"]
-        language = self._infer_language(context.messages)
-        last_user = self._last_user_message(context.messages)
+        last_user, language = self._last_user_and_language(context.messages)
         results: list[Candidate] = []
         for style in styles[: context.candidate_count]:
             text = self._fallback_text(style, last_user, language)
-            style_meta = self._styles_catalog.get(style, {})
-            features = _build_features(text, style, style_meta, language)
+            style_floats = self._style_floats.get(style, _DEFAULT_STYLE_FLOATS)
+            features = _build_features(text, style, style_floats, language)
             results.append(Candidate(text=text, style=style, features=features))
         return results
 
     def _fallback_text(self, style: str, last_user: str, language: str) -> str:
-        prompts = {
-            "empathetic": {
-                "en": (
-                    f"I hear how that feels: {last_user[:120]}".rstrip(".")
-                    + ". Would one small step today help you steady things?"
-                ),
-                "ja": (
-                    f"気持ち、伝わってきました：{last_user[:60]}".rstrip("。")
-                    + "。まず一歩、どんな行動が安心につながりそう？"
-                ),
-            },
-            "logical": {
-                "en": (
-                    "Let's map it quickly. Core issue: "
-                    f"{last_user[:80]}".rstrip(".")
-                    + ". Next, pick one actionable constraint to test."
-                ),
-                "ja": (
-                    "論点を整理しよう。焦点は" + f"{last_user[:40]}".rstrip("。")
-                    + "。次に試せる制約をひとつ選ぼう。"
-                ),
-            },
-            "coach": {
-                "en": "Picture the progress you want this week. What's one move you can commit to?",
-                "ja": "今週進めたい形は？ 直近でやれる一手を一緒に決めよう。",
-            },
-            "playful": {
-                "en": "If this were a game, your move would set the tone—want to try a tiny bold experiment?",
-                "ja": "ゲーム感覚でいこう！次の一手で雰囲気が決まるよ。小さな実験、試してみない？",
-            },
-            "concise_expert": {
-                "en": "Focus on the single lever with the biggest upside and schedule a quick review after acting.",
-                "ja": "一番リターンの高いレバーに絞って動こう。実行後すぐにセルフレビューを。",
-            },
-        }
         language = language if language in {"ja", "en"} else "ja"
-        style_prompts = prompts.get(style, prompts["empathetic"])
-        return style_prompts.get(language, style_prompts["ja"])
+        static = _STATIC_FALLBACKS.get(style)
+        if static is not None:
+            return static[language]
+        echo = _ECHO_FALLBACKS.get(style, _ECHO_FALLBACKS["empathetic"])
+        prefix, limit, punctuation, suffix = echo[language]
+        return prefix + last_user[:limit].rstrip(punctuation) + suffix
 
     def _format_history(self, messages: Iterable[Message], last_k: int = 4) -> str:
-        recent = list(messages)[-last_k:]
-        return "\n".join(f"[{msg.role.upper()}] {msg.content}" for msg in recent)
+        # Slice sequences directly; only one-shot iterables need a bounded buffer.
+        if isinstance(messages, Sequence):
+            recent = messages[-last_k:]
+        else:
+            recent = deque(messages, maxlen=last_k)
+        return "\n".join([f"[{msg.role.upper()}] {msg.content}" for msg in recent])
 
     def _last_user_message(self, messages: Sequence[Message]) -> str:
         for message in reversed(messages):
@@ -274,14 +374,24 @@ class CandidateGenerator:
                 return message.content
         return ""
 
-    def _infer_language(self, messages: Sequence[Message]) -> str:
+    def _last_user_and_language(self, messages: Sequence[Message]) -> tuple[str, str]:
         last_user = self._last_user_message(messages)
-        if last_user:
-            return _detect_language(last_user)
-        return "ja"
+        return last_user, _detect_language(last_user) if last_user else "ja"
+
+    def _infer_language(self, messages: Sequence[Message]) -> str:
+        return self._last_user_and_language(messages)[1]
+
+
+_GLOBAL_GENERATOR: CandidateGenerator | None = None
+
 
+def _get_global_generator() -> CandidateGenerator:
+    # Built on first use so importing the module does not touch the prompt files.
+    global _GLOBAL_GENERATOR
 
-_GLOBAL_GENERATOR = CandidateGenerator()
+    if _GLOBAL_GENERATOR is None:
+        _GLOBAL_GENERATOR = CandidateGenerator()
+    return _GLOBAL_GENERATOR
 
 
 def _normalise_messages(history: Sequence | None) -> list[Message]:
@@ -318,4 +428,4 @@ def generate_candidates(
         candidate_count=candidate_count,
         styles_allowed=list(styles_whitelist) if styles_whitelist else None,
     )
-    return _GLOBAL_GENERATOR.generate(context)
+    return _get_global_generator().generate(context)
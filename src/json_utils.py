@@ -0,0 +1,43 @@
+"""JSON helpers that use orjson when it is installed."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumps(obj: Any, *, sort_keys: bool = False) -> bytes:
+    """Encode ``obj`` as compact UTF-8 JSON bytes."""
+
+    if orjson is not None:
+        # Log payloads may carry NumPy scalars; the stdlib encoder
+        # accepts np.float64 as a float subclass, so keep orjson equally lenient.
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys
+    ).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode a JSON document from bytes or text.
+
+    Raises ``json.JSONDecodeError`` on malformed input regardless of the
+    backend (orjson's error type subclasses it).
+    """
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+__all__ = ["JSONDecodeError", "dumps", "loads", "orjson"]
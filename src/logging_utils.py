@@ -2,19 +2,26 @@
 
 from __future__ import annotations
 
-import json
+import atexit
+import functools
 import os
 import platform
 import threading
+import weakref
 from collections.abc import Iterable
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
+from .json_utils import dumps
 from .types import Candidate, InteractionLogRecord
 
 _APPEND_LOCK = threading.Lock()
+# Absolute path, O_APPEND descriptor and inode of the turns log currently being
+# written; reopened when the date or working directory changes, or when the file
+# was rotated or deleted underneath us.
+_turn_log: tuple[str, int, int] | None = None
 
 
 def _candidate_to_dict(candidate: Candidate) -> dict[str, Any]:
@@ -70,9 +77,7 @@ def log_turn(session_id: str, turn_id: str, payload: dict[str, Any]) -> None:
     """Append a single turn entry to a date-partitioned JSONL file."""
 
     now = datetime.now(timezone.utc)
-    date_str = now.strftime("%Y%m%d")
-    log_path = Path("logs") / f"turns-{date_str}.jsonl"
-    log_path.parent.mkdir(parents=True, exist_ok=True)
+    log_path = _turn_log_name(now.date())
 
     candidates = payload.get("candidates") or []
     if isinstance(candidates, Iterable) and not isinstance(candidates, (str, bytes)):
@@ -101,19 +106,68 @@ def log_turn(session_id: str, turn_id: str, payload: dict[str, Any]) -> None:
         if key in payload:
             entry[key] = payload[key]
 
+    _append_turn_line(log_path, dumps(entry) + b"\n")
+
+
+@functools.lru_cache(maxsize=4)
+def _turn_log_name(day: date) -> str:
+    return os.path.join("logs", f"turns-{day:%Y%m%d}.jsonl")
+
+
+def _append_turn_line(log_path: str, line: bytes) -> None:
+    global _turn_log
+
+    path = os.path.abspath(log_path)
+    with _APPEND_LOCK:
+        if _turn_log is None or _turn_log[0] != path or not _is_current(path, _turn_log[2]):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            if _turn_log is None:
+                atexit.register(_close_turn_log)
+            else:
+                os.close(_turn_log[1])
+            _turn_log = (path, fd, os.fstat(fd).st_ino)
+        view = memoryview(line)
+        while view:
+            view = view[os.write(_turn_log[1], view):]
+
+
+def _is_current(path: str | Path, inode: int) -> bool:
+    """Return whether ``path`` still names the file with ``inode``."""
+
+    try:
+        return os.stat(path).st_ino == inode
+    except FileNotFoundError:
+        return False
+
+
+def _close_turn_log() -> None:
+    global _turn_log
+
     with _APPEND_LOCK:
-        with log_path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        if _turn_log is not None:
+            os.close(_turn_log[1])
+            _turn_log = None
 
 
 @dataclass
 class JsonlInteractionLogger:
-    """Append-only JSONL logger for interaction data."""
+    """Append-only JSONL logger for interaction data.
+
+    The file is kept open between records and reopened if it was rotated or
+    deleted; every record is flushed as soon as it is written so readers (and
+    ``/metrics``) see complete lines.
+    """
 
     path: Path
+    _handle: BinaryIO | None = field(default=None, init=False, repr=False)
+    _inode: int = field(default=0, init=False, repr=False)
+    # Closes the handle when the logger is collected or at exit, without
+    # keeping the logger itself alive.
+    _finalizer: weakref.finalize | None = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     def log(self, record: InteractionLogRecord) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
         payload = {
             "context_hash": record.context_hash,
             "session_id": record.session_id,
@@ -124,5 +178,23 @@ class JsonlInteractionLogger:
             "reward": record.reward,
             "features": record.features,
         }
-        with self.path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        line = dumps(payload) + b"\n"
+        with self._lock:
+            if self._handle is None or not _is_current(self.path, self._inode):
+                self._close_handle()
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._handle = handle = self.path.open("ab", buffering=1 << 16)
+                self._inode = os.fstat(handle.fileno()).st_ino
+                self._finalizer = weakref.finalize(self, handle.close)
+            self._handle.write(line)
+            self._handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_handle()
+
+    def _close_handle(self) -> None:
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self._handle = None
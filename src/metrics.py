@@ -2,97 +2,251 @@
 
 from __future__ import annotations
 
-import json
+import math
+import os
+import threading
 from collections import Counter
+from collections.abc import Collection, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
-from statistics import mean, pstdev
 from typing import Any
 
-DEFAULT_LOG_DIR = Path("logs")
+import numpy as np
 
+from .json_utils import JSONDecodeError, loads
 
-def _load_latest_records(log_dir: Path) -> list[dict[str, Any]]:
-    files = sorted(log_dir.glob("turns-*.jsonl"))
-    if not files:
-        return []
-    latest = files[-1]
-    records: list[dict[str, Any]] = []
-    with latest.open("r", encoding="utf-8") as handle:
-        for line in handle:
-            content = line.strip()
-            if not content:
-                continue
-            try:
-                records.append(json.loads(content))
-            except json.JSONDecodeError:
-                continue
-    return records
+DEFAULT_LOG_DIR = Path("logs")
+# Below this many turns NumPy setup costs more than the Python reduction.
+_NUMPY_MIN_RECORDS = 256
+
+TurnKey = tuple[str | None, str | None]
+
+
+def _latest_log(log_dir: Path) -> Path | None:
+    # File names embed the date as YYYYMMDD, so the lexicographic maximum is
+    # the latest log; one scandir pass avoids building and sorting Paths.
+    latest: str | None = None
+    try:
+        with os.scandir(log_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if (
+                    name.startswith("turns-")
+                    and name.endswith(".jsonl")
+                    and (latest is None or name > latest)
+                ):
+                    latest = name
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return log_dir / latest if latest is not None else None
+
+
+def _iter_records(data: bytes) -> Iterator[dict[str, Any]]:
+    for line in data.split(b"\n"):
+        if not line or line.isspace():
+            continue
+        try:
+            record = loads(line)
+        except JSONDecodeError:
+            continue
+        if isinstance(record, dict):
+            yield record
 
 
-def compute_metrics(log_dir: Path | None = None) -> dict[str, Any]:
-    """Return aggregate metrics using the latest JSONL log.
+def _read_complete_lines(path: Path, offset: int) -> tuple[bytes, int]:
+    """Return the complete lines after ``offset`` and the new offset.
 
-    The returned dictionary contains keys: turn_count, avg_reward,
-    style_win_rates, exploration_rate, propensity_mean, propensity_std.
+    A trailing line without a newline is left for the next read, since the
+    writer may still be appending it.
     """
 
-    directory = log_dir or DEFAULT_LOG_DIR
-    records = _load_latest_records(directory)
-    by_turn: dict[tuple[str | None, str | None], dict[str, Any]] = {}
-    for record in records:
-        key = (record.get("session_id"), record.get("turn_id"))
-        by_turn[key] = record
-
-    final_records = list(by_turn.values())
-    total = len(final_records)
-    if total == 0:
-        return {
-            "turn_count": 0,
-            "avg_reward": None,
-            "style_win_rates": {},
-            "exploration_rate": 0.0,
-            "propensity_mean": None,
-            "propensity_std": None,
-        }
-
-    rewards = [r["reward"] for r in final_records if r.get("reward") is not None]
-    avg_reward = mean(rewards) if rewards else None
-
-    prop_values = [r["propensity"] for r in final_records if r.get("propensity") is not None]
-    prop_mean = mean(prop_values) if prop_values else None
-    prop_std = pstdev(prop_values) if len(prop_values) > 1 else 0.0 if prop_values else None
+    with path.open("rb") as handle:
+        handle.seek(offset)
+        data = handle.read()
+    end = data.rfind(b"\n") + 1
+    return data[:end], offset + end
+
+
+@dataclass
+class _TailState:
+    """Deduplicated turns read so far from one log file."""
+
+    identity: tuple[str, int]
+    offset: int = 0
+    by_turn: dict[TurnKey, dict[str, Any]] = field(default_factory=dict)
+
+
+_cache_lock = threading.Lock()
+_cached_metrics: tuple[tuple[str, int, int], dict[str, Any]] | None = None
+_tail: _TailState | None = None
+
+
+def _empty_metrics() -> dict[str, Any]:
+    return {
+        "turn_count": 0,
+        "avg_reward": None,
+        "style_win_rates": {},
+        "exploration_rate": 0.0,
+        "propensity_mean": None,
+        "propensity_std": None,
+    }
+
+
+def _copy_metrics(result: dict[str, Any]) -> dict[str, Any]:
+    # Callers may mutate the payload; copy the nested rates too so the memo
+    # stays intact.
+    return {**result, "style_win_rates": dict(result["style_win_rates"])}
+
+
+def _chosen_style(record: dict[str, Any]) -> str | None:
+    chosen_idx = record.get("chosen_idx")
+    candidates = record.get("candidates") or []
+    if chosen_idx is None or not isinstance(candidates, list):
+        return None
+    if 0 <= chosen_idx < len(candidates):
+        return candidates[chosen_idx].get("style", "unknown")
+    return None
 
+
+def _aggregate_python(records: Collection[dict[str, Any]]) -> dict[str, Any]:
+    total = len(records)
+    reward_sum = 0.0
+    reward_n = 0
+    prop_n = 0
+    prop_mean = 0.0
+    prop_m2 = 0.0
     style_counter: Counter[str] = Counter()
-    for record in final_records:
-        candidates = record.get("candidates") or []
+    # Candidate indices are small ints, so a bitmask replaces set hashing;
+    # anything that does not fit falls back to the set.
+    seen_mask = 0
+    other_indices: set[Any] = set()
+    for record in records:
+        reward = record.get("reward")
+        if reward is not None:
+            reward_sum += reward
+            reward_n += 1
+        propensity = record.get("propensity")
+        if propensity is not None:
+            # Welford's online update keeps the mean and variance in one pass.
+            prop_n += 1
+            delta = propensity - prop_mean
+            prop_mean += delta / prop_n
+            prop_m2 += delta * (propensity - prop_mean)
         chosen_idx = record.get("chosen_idx")
-        if not isinstance(candidates, list) or chosen_idx is None:
+        if chosen_idx is None:
             continue
-        if 0 <= chosen_idx < len(candidates):
-            style = candidates[chosen_idx].get("style", "unknown")
+        if type(chosen_idx) is int and 0 <= chosen_idx < 64:
+            seen_mask |= 1 << chosen_idx
+        else:
+            other_indices.add(chosen_idx)
+        style = _chosen_style(record)
+        if style is not None:
             style_counter[style] += 1
 
-    style_win_rates = (
-        {style: count / total for style, count in style_counter.items()}
-        if style_counter
-        else {}
+    return {
+        "turn_count": total,
+        "avg_reward": reward_sum / reward_n if reward_n else None,
+        "style_win_rates": {
+            style: count / total for style, count in style_counter.most_common()
+        },
+        "exploration_rate": (seen_mask.bit_count() + len(other_indices)) / total,
+        "propensity_mean": prop_mean if prop_n else None,
+        "propensity_std": math.sqrt(prop_m2 / prop_n) if prop_n else None,
+    }
+
+
+def _float_column(records: Collection[dict[str, Any]], key: str) -> np.ndarray:
+    return np.fromiter(
+        (np.nan if (value := record.get(key)) is None else value for record in records),
+        dtype=np.float64,
+        count=len(records),
     )
 
-    unique_indices = {
-        record.get("chosen_idx")
-        for record in final_records
-        if record.get("chosen_idx") is not None
-    }
-    exploration_rate = (len(unique_indices) / total) if total else 0.0
 
+def _aggregate_numpy(records: Collection[dict[str, Any]]) -> dict[str, Any]:
+    total = len(records)
+    rewards = _float_column(records, "reward")
+    propensities = _float_column(records, "propensity")
+    chosen = _float_column(records, "chosen_idx")
+
+    style_ids: dict[str, int] = {}
+    ids = np.fromiter(
+        (
+            -1 if (style := _chosen_style(record)) is None
+            else style_ids.setdefault(style, len(style_ids))
+            for record in records
+        ),
+        dtype=np.int64,
+        count=total,
+    )
+    counts = np.bincount(ids[ids >= 0], minlength=len(style_ids))
+    styles = list(style_ids)
+
+    reward_mask = ~np.isnan(rewards)
+    prop_values = propensities[~np.isnan(propensities)]
     return {
         "turn_count": total,
-        "avg_reward": avg_reward,
-        "style_win_rates": style_win_rates,
-        "exploration_rate": exploration_rate,
-        "propensity_mean": prop_mean,
-        "propensity_std": prop_std,
+        "avg_reward": float(rewards[reward_mask].mean()) if reward_mask.any() else None,
+        "style_win_rates": {
+            styles[idx]: int(counts[idx]) / total for idx in np.argsort(-counts, kind="stable")
+        },
+        "exploration_rate": np.unique(chosen[~np.isnan(chosen)]).size / total,
+        "propensity_mean": float(prop_values.mean()) if prop_values.size else None,
+        "propensity_std": float(prop_values.std()) if prop_values.size else None,
     }
 
 
+def _aggregate_turns(final_records: Collection[dict[str, Any]]) -> dict[str, Any]:
+    if not final_records:
+        return _empty_metrics()
+    if len(final_records) >= _NUMPY_MIN_RECORDS:
+        try:
+            return _aggregate_numpy(final_records)
+        except (TypeError, ValueError):
+            pass
+    return _aggregate_python(final_records)
+
+
+def compute_metrics(log_dir: Path | None = None) -> dict[str, Any]:
+    """Return aggregate metrics using the latest JSONL log.
+
+    The returned dictionary contains keys: turn_count, avg_reward,
+    style_win_rates, exploration_rate, propensity_mean, propensity_std.
+    style_win_rates is ordered from the highest rate to the lowest.
+    Results are memoised on the latest file's path, mtime and size, and a
+    grown file is read incrementally from where the previous call stopped.
+    """
+
+    global _cached_metrics, _tail
+
+    directory = log_dir or DEFAULT_LOG_DIR
+    latest = _latest_log(directory)
+    if latest is None:
+        return _empty_metrics()
+    try:
+        stat = latest.stat()
+    except FileNotFoundError:
+        return _empty_metrics()
+
+    path = str(latest.absolute())
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        if _cached_metrics is not None and _cached_metrics[0] == key:
+            return _copy_metrics(_cached_metrics[1])
+
+        # Logs are append-only: keep the deduplicated turns between calls and
+        # only parse the bytes added since the previous read.
+        identity = (path, stat.st_ino)
+        if _tail is None or _tail.identity != identity or stat.st_size < _tail.offset:
+            _tail = _TailState(identity)
+        data, _tail.offset = _read_complete_lines(latest, _tail.offset)
+        by_turn = _tail.by_turn
+        for record in _iter_records(data):
+            by_turn[(record.get("session_id"), record.get("turn_id"))] = record
+
+        result = _aggregate_turns(by_turn.values())
+        _cached_metrics = (key, result)
+    return _copy_metrics(result)
+
+
 __all__ = ["compute_metrics"]
@@ -3,29 +3,36 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
 from dataclasses import dataclass
 
 import numpy as np
 
 from .bandit import BanditManager, LinUCB
-from .features import FeatureExtractor
+from .features import FEATURE_NAMES, FeatureExtractor
 from .generation import CandidateGenerator
+from .json_utils import dumps
 from .logging_utils import JsonlInteractionLogger, log_turn
 from .prompt_loader import PromptLoader
-from .safety.guard import review_candidates
+from .safety.guard import contains_banned_term, review_candidates
 from .types import BanditDecision, Candidate, GenerationContext, InteractionLogRecord
 
 
 def _hash_context(context: GenerationContext) -> str:
-    payload = {
-        "messages": [f"{m.role}:{m.content}" for m in context.messages],
-        "goal": context.goal,
-        "constraints": context.constraints,
-        "user_profile": context.user_profile,
-    }
-    blob = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
-    return hashlib.sha256(blob).hexdigest()
+    # Role/content pairs keep message boundaries unambiguous without building
+    # "role:content" strings; a 32-byte BLAKE2b digest keeps the 64-hex format.
+    blob = dumps(
+        [
+            [[m.role, m.content] for m in context.messages],
+            context.goal,
+            context.constraints,
+            context.user_profile,
+        ],
+        sort_keys=True,
+    )
+    return hashlib.blake2b(blob, digest_size=32).hexdigest()
 
 
 @dataclass
@@ -48,12 +55,21 @@ class PendingInteraction:
     context_hash: str
     session_id: str
     turn_id: str
-    feature_vectors: list[list[float]]
-    feature_logs: list[dict[str, float]]
+    # Only the (n_candidates, len(FEATURE_NAMES)) matrix is kept while a turn
+    # waits for feedback; the list and mapping views are rebuilt for logging.
+    feature_matrix: np.ndarray
     decision: BanditDecision
     candidates: list[Candidate]
     safety: dict[str, object]
 
+    @property
+    def feature_vectors(self) -> list[list[float]]:
+        return self.feature_matrix.tolist()
+
+    @property
+    def feature_logs(self) -> list[dict[str, float]]:
+        return [dict(zip(FEATURE_NAMES, row)) for row in self.feature_vectors]
+
 
 class ConversationOrchestrator:
     """Coordinates candidate generation, selection, and logging."""
@@ -66,6 +82,7 @@ class ConversationOrchestrator:
         feature_extractor: FeatureExtractor | None = None,
         logger: JsonlInteractionLogger | None = None,
         bandit_algo: str = "linucb",
+        pending_limit: int = 4096,
     ) -> None:
         self._generator = generator or CandidateGenerator(prompt_loader)
         if feature_extractor is None:
@@ -74,7 +91,12 @@ class ConversationOrchestrator:
         self._bandit = bandit_manager or BanditManager(LinUCB())
         self._logger = logger
         self._bandit_algo = bandit_algo
-        self._pending: dict[tuple[str, str], PendingInteraction] = {}
+        # Turns awaiting feedback in insertion order; the oldest are dropped once
+        # more than ``pending_limit`` are outstanding.
+        self._pending: OrderedDict[tuple[str, str], PendingInteraction] = OrderedDict()
+        self._pending_limit = pending_limit
+        self._pending_lock = threading.Lock()
+        self._zero_priors: dict[int, np.ndarray] = {}
 
     @property
     def styles_catalog(self) -> dict[str, dict[str, object]]:
@@ -89,34 +111,34 @@ class ConversationOrchestrator:
     ) -> TurnResult:
         candidates = self._generator.generate(context)
         candidates, safety_meta = self._apply_safety(context, candidates)
-        feature_vectors, feature_logs = self._feature_extractor.build_features(
+        feature_matrix, feature_logs = self._feature_extractor.build_features(
             context, candidates
         )
-
-        feature_matrix = np.asarray(feature_vectors, dtype=float)
-        prior_scores = np.zeros(feature_matrix.shape[0])
+        feature_vectors = feature_matrix.tolist()
+        prior_scores = self._zero_prior(feature_matrix.shape[0])
         decision = self._bandit.select(prior_scores, feature_matrix)
         context_hash = _hash_context(context)
         session = session_id or context_hash
         turn = turn_id or context_hash
 
         propensity = decision.propensities[decision.chosen_index]
-        log_record = InteractionLogRecord(
-            context_hash=context_hash,
-            session_id=session,
-            turn_id=turn,
-            candidates=candidates,
-            chosen_idx=decision.chosen_index,
-            propensity=propensity,
-            reward=None,
-            features={
-                "vectors": feature_vectors,
-                "mappings": feature_logs,
-                "scores": decision.scores,
-                "safety": safety_meta,
-            },
-        )
+        log_features = {
+            "vectors": feature_vectors,
+            "mappings": feature_logs,
+            "scores": decision.scores,
+            "safety": safety_meta,
+        }
         if self._logger:
+            log_record = InteractionLogRecord(
+                context_hash=context_hash,
+                session_id=session,
+                turn_id=turn,
+                candidates=candidates,
+                chosen_idx=decision.chosen_index,
+                propensity=propensity,
+                reward=None,
+                features=log_features,
+            )
             self._logger.log(log_record)
 
         log_turn(
@@ -129,22 +151,26 @@ class ConversationOrchestrator:
                 "chosen_idx": decision.chosen_index,
                 "propensity": propensity,
                 "reward": None,
-                "features": log_record.features,
+                "features": log_features,
                 "bandit_algo": self._bandit_algo,
             },
         )
 
         key = (session, turn)
-        self._pending[key] = PendingInteraction(
+        pending = PendingInteraction(
             context_hash=context_hash,
             session_id=session,
             turn_id=turn,
-            feature_vectors=feature_vectors,
-            feature_logs=feature_logs,
+            feature_matrix=feature_matrix,
             decision=decision,
             candidates=candidates,
             safety=safety_meta,
         )
+        with self._pending_lock:
+            self._pending[key] = pending
+            self._pending.move_to_end(key)
+            while len(self._pending) > self._pending_limit:
+                self._pending.popitem(last=False)
 
         return TurnResult(
             context_hash=context_hash,
@@ -163,24 +189,96 @@ class ConversationOrchestrator:
         chosen_idx: int,
         reward: float,
     ) -> None:
+        pending, features = self._take_pending(session_id, turn_id, chosen_idx)
+        try:
+            self._bandit.update(features, reward, chosen_idx)
+        except Exception:
+            self._restore_pending([pending])
+            raise
+        self._log_feedback(pending, chosen_idx, reward)
+
+    def apply_feedback_batch(
+        self, items: Sequence[tuple[str, str, int, float]]
+    ) -> list[Exception | None]:
+        """Apply ``(session_id, turn_id, chosen_idx, reward)`` items together.
+
+        Valid items share one bandit update. The result holds, per item, the
+        error ``apply_feedback`` would have raised, or ``None`` on success.
+        """
+
+        errors: list[Exception | None] = []
+        accepted: list[tuple[int, PendingInteraction, int, float]] = []
+        rows: list[np.ndarray] = []
+        for position, (session_id, turn_id, chosen_idx, reward) in enumerate(items):
+            try:
+                pending, features = self._take_pending(session_id, turn_id, chosen_idx)
+            except (KeyError, ValueError) as exc:
+                errors.append(exc)
+                continue
+            errors.append(None)
+            accepted.append((position, pending, chosen_idx, reward))
+            rows.append(features[chosen_idx])
+
+        if accepted:
+            rewards = np.fromiter((reward for *_, reward in accepted), dtype=float)
+            try:
+                self._bandit.update_batch(np.vstack(rows), rewards)
+            except Exception as exc:
+                # Nothing was learned, so keep the turns open for a retry; items
+                # rejected above keep their own 404/400 errors.
+                self._restore_pending([pending for _, pending, _, _ in accepted])
+                for position, *_ in accepted:
+                    errors[position] = exc
+                return errors
+            for position, pending, chosen_idx, reward in accepted:
+                try:
+                    self._log_feedback(pending, chosen_idx, reward)
+                except Exception as exc:
+                    errors[position] = exc
+        return errors
+
+    def _zero_prior(self, count: int) -> np.ndarray:
+        """Return a shared read-only zero prior for ``count`` candidates."""
+
+        prior = self._zero_priors.get(count)
+        if prior is None:
+            prior = np.zeros(count)
+            prior.setflags(write=False)
+            prior = self._zero_priors.setdefault(count, prior)
+        return prior
+
+    def _take_pending(
+        self, session_id: str, turn_id: str, chosen_idx: int
+    ) -> tuple[PendingInteraction, np.ndarray]:
         key = (session_id, turn_id)
-        pending = self._pending.pop(key, None)
+        with self._pending_lock:
+            pending = self._pending.pop(key, None)
         if not pending:
             raise KeyError("該当のターンが見つかりませんでした")
 
-        feature_matrix = np.asarray(pending.feature_vectors, dtype=float)
+        feature_matrix = pending.feature_matrix
         if chosen_idx < 0 or chosen_idx >= feature_matrix.shape[0]:
             raise ValueError("選択された候補が一致しません")
+        return pending, feature_matrix
+
+    def _restore_pending(self, entries: Sequence[PendingInteraction]) -> None:
+        """Put taken turns back after a failed update so feedback can be retried."""
 
-        self._bandit.update(feature_matrix, reward, chosen_idx)
+        with self._pending_lock:
+            for pending in entries:
+                self._pending.setdefault((pending.session_id, pending.turn_id), pending)
 
+    def _log_feedback(self, pending: PendingInteraction, chosen_idx: int, reward: float) -> None:
+        session_id = pending.session_id
+        turn_id = pending.turn_id
         propensity = (
             pending.decision.propensities[chosen_idx]
             if 0 <= chosen_idx < len(pending.decision.propensities)
             else None
         )
+        feature_vectors = pending.feature_vectors
         log_features = {
-            "vectors": pending.feature_vectors,
+            "vectors": feature_vectors,
             "mappings": pending.feature_logs,
             "scores": pending.decision.scores,
             "safety": pending.safety,
@@ -239,21 +337,69 @@ class ConversationOrchestrator:
                     "attempts": attempts + 1,
                 }
                 return filtered, meta
+            if attempts == 0:
+                # Redaction alone often clears a rejected batch (a phone number,
+                # say), so re-review the rewrites before paying for a second
+                # generation pass. Redaction only strips PII and trims length,
+                # so candidates with a banned term always go to regeneration.
+                redactable = [
+                    idx
+                    for idx, (cand, rewrite) in enumerate(zip(candidates, rewrites))
+                    if rewrite
+                    and not contains_banned_term(cand.text)
+                    and not contains_banned_term(rewrite)
+                ]
+                rewritten = [
+                    Candidate(
+                        text=rewrites[idx],
+                        style=candidates[idx].style,
+                        features={
+                            **candidates[idx].features,
+                            "length_chars": len(rewrites[idx]),
+                            "length_words": len(rewrites[idx].split()),
+                        },
+                    )
+                    for idx in redactable
+                ]
+                approved, rewrite_scores, _ = (
+                    review_candidates(rewritten) if rewritten else ([], [], [])
+                )
+                if approved:
+                    filtered = [
+                        Candidate(
+                            text=rewritten[idx].text,
+                            style=rewritten[idx].style,
+                            features={
+                                **rewritten[idx].features,
+                                "safety_score": rewrite_scores[idx],
+                                "sanitized": True,
+                            },
+                        )
+                        for idx in approved
+                    ]
+                    merged_scores = list(scores)
+                    for idx, score in zip(redactable, rewrite_scores):
+                        merged_scores[idx] = score
+                    meta = {
+                        "approved_indices": [redactable[idx] for idx in approved],
+                        "scores": merged_scores,
+                        "rewrites": rewrites,
+                        "attempts": 1,
+                        "sanitized": True,
+                    }
+                    return filtered, meta
             attempts += 1
             if attempts < 2:
-                candidates = self._generator.generate(context)
+                # A cached completion would hand back the batch just rejected.
+                candidates = self._generator.generate(context, use_cache=False)
 
         sanitized: list[Candidate] = []
         sanitized_scores: list[float] = []
         source_candidates = candidates or original_candidates
         for idx, cand in enumerate(source_candidates):
             text = last_rewrites[idx] if idx < len(last_rewrites) and last_rewrites[idx] else cand.text
-            cand_features = dict(cand.features)
             score = last_scores[idx] if idx < len(last_scores) else 0.0
-            cand_features.update({
-                "safety_score": score,
-                "sanitized": True,
-            })
+            cand_features = {**cand.features, "safety_score": score, "sanitized": True}
             sanitized.append(Candidate(text=text, style=cand.style, features=cand_features))
             sanitized_scores.append(score)
 
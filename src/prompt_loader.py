@@ -13,6 +13,10 @@ class PromptLoader:
         self._root = root
         self._cache: dict[str, str] = {}
 
+    @property
+    def root(self) -> Path:
+        return self._root
+
     def list_prompt_ids(self) -> Iterable[str]:
         """Yield prompt identifiers sorted lexicographically."""
 
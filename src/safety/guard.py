@@ -2,45 +2,68 @@
 
 from __future__ import annotations
 
+import functools
 import os
 import re
 from collections.abc import Sequence
 
 from ..types import Candidate
 
-PII_PATTERN = re.compile(r"\b(\d{3}-\d{4}|\d{3}-\d{3}-\d{4}|[0-9]{8,})\b")
+# Digit lookarounds rather than \b: Japanese text has no word boundary before a
+# number, and the three-group form is tried first so a full number is redacted.
+PII_PATTERN = re.compile(r"(?<!\d)(\d{2,4}-\d{2,4}-\d{4}|\d{3}-\d{4}|\d{8,})(?!\d)")
 BANNED_TERMS = [
     "kill yourself",
     "bomb",
     "credit card",
 ]
 MAX_LENGTH = 640
+# Every PII match starts with a digit, and probing for one is several times
+# cheaper than the boundary-anchored pattern, so most candidates stop there.
+_DIGIT = re.compile(r"\d")
 
 
 def _contains_pii(text: str) -> bool:
-    return bool(PII_PATTERN.search(text))
+    digit = _DIGIT.search(text)
+    return digit is not None and PII_PATTERN.search(text, digit.start()) is not None
+
+
+def contains_banned_term(text: str) -> bool:
+    """Return whether ``text`` contains a term that redaction cannot remove."""
 
 
-def _contains_banned_term(text: str) -> bool:
     lowered = text.lower()
     return any(term in lowered for term in BANNED_TERMS)
 
 
-def _score_candidate(text: str) -> float:
+def _table_score(pii: bool, banned: bool, too_long: bool) -> float:
     score = 1.0
-    if _contains_pii(text):
+    if pii:
         score -= 0.6
-    if _contains_banned_term(text):
+    if banned:
         score -= 0.7
-    if len(text) > MAX_LENGTH:
+    if too_long:
         score -= 0.2
     return max(0.0, min(1.0, score))
 
 
+# Scores for every (pii, banned, too_long) combination, indexed by a 3-bit flag
+# word; built with the same arithmetic so the values match bit for bit.
+_SCORE_TABLE = tuple(
+    _table_score(bool(flags & 1), bool(flags & 2), bool(flags & 4)) for flags in range(8)
+)
+
+
+# Offline fallbacks and templated replies repeat verbatim across turns, and a
+# hit costs one string hash instead of the three checks.
+@functools.lru_cache(maxsize=1024)
+def _score_candidate(text: str) -> float:
+    flags = _contains_pii(text) | contains_banned_term(text) << 1 | (len(text) > MAX_LENGTH) << 2
+    return _SCORE_TABLE[flags]
+
+
 def _rewrite(text: str) -> str:
-    trimmed = text[:MAX_LENGTH]
-    sanitized = re.sub(PII_PATTERN, "[REDACTED]", trimmed)
-    return sanitized
+    return PII_PATTERN.sub("[REDACTED]", text[:MAX_LENGTH])
 
 
 def review_candidates(
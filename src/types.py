@@ -6,7 +6,7 @@ from dataclasses import dataclass, field
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """Represents a single message in the dialog history."""
 
@@ -14,7 +14,7 @@ class Message:
     content: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Candidate:
     """A generated candidate reply with attached feature metadata."""
 
@@ -23,7 +23,7 @@ class Candidate:
     features: dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class GenerationContext:
     """Input context for generating reply candidates."""
 
@@ -35,7 +35,7 @@ class GenerationContext:
     candidate_count: int = 3
 
 
-@dataclass
+@dataclass(slots=True)
 class BanditDecision:
     """Decision returned by the bandit policy."""
 
@@ -44,7 +44,7 @@ class BanditDecision:
     scores: list[float]
 
 
-@dataclass
+@dataclass(slots=True)
 class InteractionLogRecord:
     """Structure recorded for every interaction step."""
 
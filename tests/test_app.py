@@ -99,3 +99,141 @@ def test_api_turn_and_feedback(tmp_path, monkeypatch):
     feedback_response = client.post("/api/feedback", json=feedback_payload)
     assert feedback_response.status_code == 200
     assert feedback_response.json()["status"] == "ok"
+
+
+def test_batch_turn_and_feedback(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_PATH", str(tmp_path / "interactions.jsonl"))
+    monkeypatch.setenv("CANDIDATE_COUNT", "2")
+
+    if "src.app" in sys.modules:
+        importlib.invalidate_caches()
+        sys.modules.pop("src.app")
+
+    app_module = importlib.import_module("src.app")
+    client = TestClient(app_module.app)
+
+    ops = [
+        {"id": "a", "op": "turn", "body": {"user_utterance": "おはよう", "session_id": "batch-a"}},
+        {"id": "b", "op": "turn", "body": {"user_utterance": "こんにちは", "session_id": "batch-b"}},
+        {"id": "c", "op": "turn", "body": {"history": []}},
+    ]
+    response = client.post("/batch", json=ops)
+    assert response.status_code == 200
+    results = {item["id"]: item for item in response.json()["results"]}
+    assert results["a"]["status"] == 200
+    assert results["b"]["result"]["session_id"] == "batch-b"
+    assert results["c"]["status"] == 422 and results["c"]["error"]
+
+    turn = results["a"]["result"]
+    feedback_ops = [
+        {
+            "id": "fb",
+            "op": "feedback",
+            "body": {
+                "session_id": turn["session_id"],
+                "turn_id": turn["turn_id"],
+                "chosen_idx": turn["chosen_idx"],
+                "reward": 1.0,
+            },
+        },
+        {
+            "id": "missing",
+            "op": "feedback",
+            "body": {"session_id": "batch-a", "turn_id": "nope", "chosen_idx": 0, "reward": 1.0},
+        },
+    ]
+    response = client.post("/batch", json=feedback_ops)
+    results = {item["id"]: item for item in response.json()["results"]}
+    assert results["fb"]["status"] == 200
+    assert results["fb"]["result"] == {"status": "ok"}
+    assert results["missing"]["status"] == 404
+
+
+def test_session_lock_eviction_keeps_busy_locks(monkeypatch):
+    import asyncio
+    from collections import OrderedDict
+
+    app_module = importlib.import_module("src.app")
+    monkeypatch.setattr(app_module, "_SESSION_LOCK_LIMIT", 4)
+    monkeypatch.setattr(app_module, "_session_locks", OrderedDict())
+
+    async def scenario():
+        release = asyncio.Event()
+        entered: list[str] = []
+
+        async def hold(session):
+            async with app_module._session_guard(session):
+                entered.append(session)
+                await release.wait()
+
+        held = app_module._lock_for("held")
+        tasks = [asyncio.create_task(hold("held")), asyncio.create_task(hold("held"))]
+        await asyncio.sleep(0)
+        assert held.users == 2 and entered == ["held"]
+
+        for index in range(8):
+            app_module._lock_for(f"idle-{index}")
+
+        assert app_module._lock_for("held") is held
+        assert len(app_module._session_locks) <= 4
+        release.set()
+        await asyncio.gather(*tasks)
+        assert held.users == 0 and entered == ["held", "held"]
+
+    asyncio.run(scenario())
+
+
+def test_batch_reports_unexpected_errors_per_op(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_PATH", str(tmp_path / "interactions.jsonl"))
+
+    if "src.app" in sys.modules:
+        importlib.invalidate_caches()
+        sys.modules.pop("src.app")
+
+    app_module = importlib.import_module("src.app")
+    client = TestClient(app_module.app)
+    handle_turn = app_module._handle_turn
+
+    async def flaky_turn(request):
+        if request.user_utterance == "boom":
+            raise RuntimeError("generator exploded")
+        return await handle_turn(request)
+
+    monkeypatch.setattr(app_module, "_handle_turn", flaky_turn)
+    ops = [
+        {"id": "ok", "op": "turn", "body": {"user_utterance": "おはよう", "session_id": "s"}},
+        {"id": "bad", "op": "turn", "body": {"user_utterance": "boom"}},
+    ]
+    response = client.post("/batch", json=ops)
+
+    assert response.status_code == 200
+    results = {item["id"]: item for item in response.json()["results"]}
+    assert results["ok"]["status"] == 200
+    assert results["ok"]["result"]["session_id"] == "s"
+    assert results["bad"]["status"] == 500 and results["bad"]["error"]
+
+
+def test_api_turn_rejects_oversized_json_fields(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_PATH", str(tmp_path / "interactions.jsonl"))
+
+    if "src.app" in sys.modules:
+        importlib.invalidate_caches()
+        sys.modules.pop("src.app")
+
+    app_module = importlib.import_module("src.app")
+    calls: list[str] = []
+
+    def no_orchestrator(*args, **kwargs):
+        calls.append("orchestrator")
+        raise AssertionError("orchestrator must not be used for rejected input")
+
+    monkeypatch.setattr(app_module, "_get_orchestrator", no_orchestrator)
+    monkeypatch.setattr(app_module, "_run_turn", no_orchestrator)
+    client = TestClient(app_module.app)
+
+    oversized = json.dumps(["x" * 100] * (app_module._FORM_JSON_MAX_CHARS // 100 + 1))
+    form_data = {"history_json": oversized, "user_utterance": "今日はどう動く？"}
+    response = client.post("/api/turn", data=form_data)
+
+    assert response.status_code == 413
+    assert not calls
@@ -4,7 +4,7 @@ import numpy as np
 
 from src.bandit.lints import LinTS
 from src.bandit.linucb import LinUCB
-from src.bandit.utils import softmax
+from src.bandit.utils import softmax, softmax_small
 
 
 def _simulate(policy, rng, iterations: int = 200, noise: float = 0.0) -> np.ndarray:
@@ -44,3 +44,88 @@ def test_lints_learns_linear_task():
     assert hasattr(policy, "_b") and policy._b is not None
     assert not np.allclose(policy._A, policy._lambda * np.eye(policy._A.shape[0]))
     assert np.linalg.norm(policy._b) > 0.0
+
+
+def test_update_batch_matches_sequential_updates():
+    rng = np.random.default_rng(2)
+    rows = rng.normal(size=(5, 3))
+    rewards = rng.normal(size=5)
+    batched = LinUCB(alpha=0.7, lam=1.0, beta=1.0)
+    sequential = LinUCB(alpha=0.7, lam=1.0, beta=1.0)
+
+    batched.update_batch(rows, rewards)
+    for row, reward in zip(rows, rewards):
+        sequential.update(row[np.newaxis, :], float(reward), 0)
+
+    assert np.allclose(batched._A, sequential._A)
+    assert np.allclose(batched._b, sequential._b)
+
+
+def test_linucb_scores_match_closed_form():
+    rng = np.random.default_rng(3)
+    policy = LinUCB(alpha=0.7, lam=1.0, beta=1.0)
+    for _ in range(20):
+        features = rng.normal(size=(4, 3))
+        policy.update(features, float(rng.normal()), int(rng.integers(4)))
+
+    features = rng.normal(size=(4, 3))
+    policy.select(np.zeros(4), features)
+
+    A_inv = np.linalg.inv(policy._A)
+    expected = features @ (A_inv @ policy._b) + 0.7 * np.sqrt(
+        np.sum(features @ A_inv * features, axis=1)
+    )
+    assert np.allclose(policy.last_scores, expected)
+
+
+def test_softmax_small_matches_numpy_softmax():
+    rng = np.random.default_rng(4)
+    for scores in (rng.normal(size=3), rng.normal(size=16) * 50, np.array([0.0, np.nan])):
+        expected = softmax(scores, beta=1.3)
+        assert np.allclose(softmax_small(scores.tolist(), 1.3), expected)
+
+
+def test_incremental_inverse_tracks_A():
+    rng = np.random.default_rng(5)
+    policy = LinTS(sigma2=0.5, lam=1.0, beta=1.0, random_state=0)
+    for step in range(300):
+        features = rng.normal(size=(3, 4))
+        policy.select(np.zeros(3), features)
+        policy.update(features, float(rng.normal()), step % 3)
+        if step % 50 == 0:
+            assert np.allclose(policy._A_inv, np.linalg.inv(policy._A))
+
+    assert np.allclose(policy._A_inv, np.linalg.inv(policy._A))
+    assert np.allclose(policy._theta, np.linalg.solve(policy._A, policy._b))
+
+
+def test_lints_recovers_from_indefinite_inverse():
+    rng = np.random.default_rng(11)
+    policy = LinTS(sigma2=0.5, lam=1.0, beta=1.0, random_state=0)
+    for step in range(5):
+        features = rng.normal(size=(3, 4))
+        policy.select(np.zeros(3), features)
+        policy.update(features, float(rng.normal()), step % 3)
+
+    # Simulate roundoff drift that leaves A^-1 not positive-definite.
+    policy._A_inv[0, 0] = -1.0
+    policy._C = None
+    chosen, _ = policy._select_impl(np.zeros(3), rng.normal(size=(3, 4)))
+
+    assert 0 <= chosen < 3
+    assert np.allclose(policy._A_inv, np.linalg.inv(policy._A))
+    assert np.allclose(policy._C @ policy._C.T, policy._A_inv)
+
+
+def test_small_update_batch_stays_incremental(monkeypatch):
+    rng = np.random.default_rng(7)
+    policy = LinUCB(alpha=0.7, lam=1.0, beta=1.0)
+    policy.update_batch(rng.normal(size=(6, 4)), rng.normal(size=6))
+
+    resyncs = []
+    monkeypatch.setattr(policy, "_resync", lambda: resyncs.append(1))
+    policy.update_batch(rng.normal(size=(2, 4)), rng.normal(size=2))
+
+    assert not resyncs
+    assert np.allclose(policy._A_inv, np.linalg.inv(policy._A))
+    assert np.allclose(policy._theta, np.linalg.solve(policy._A, policy._b))
@@ -23,3 +23,38 @@ def test_candidate_generator_fallback(monkeypatch):
     for candidate in candidates:
         assert candidate.text
         assert candidate.features.get("language") in {"ja", "en"}
+
+
+def test_completion_cache_hits_skips_malformed_and_bypasses(monkeypatch):
+    import json
+    import sys
+    import types
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setitem(sys.modules, "openai", types.SimpleNamespace(OpenAI=lambda api_key: None))
+    generator = CandidateGenerator(PromptLoader(Path("prompts")))
+    replies = ["not json", json.dumps([{"text": "first", "style": "logical"}])]
+    calls: list[str] = []
+
+    def fake_request(client, user_content):
+        calls.append(user_content)
+        return replies.pop(0) if replies else json.dumps([{"text": "fresh", "style": "coach"}])
+
+    monkeypatch.setattr(generator, "_request_completion", fake_request)
+    context = GenerationContext(
+        messages=[Message(role="user", content="How should I plan today?")],
+        candidate_count=1,
+    )
+
+    # A malformed reply falls back and is not cached, so the next call asks again.
+    assert generator.generate(context)[0].text != "first"
+    assert generator.generate(context)[0].text == "first"
+    assert len(calls) == 2
+
+    assert generator.generate(context)[0].text == "first"
+    assert len(calls) == 2
+
+    assert generator.generate(context, use_cache=False)[0].text == "fresh"
+    assert len(calls) == 3
+    assert generator.generate(context)[0].text == "fresh"
+    assert len(calls) == 3
@@ -40,3 +40,46 @@ def test_log_turn_creates_file(tmp_path, monkeypatch):
     assert record["turn_id"] == turn_id
     assert record["candidates"][0]["text_preview"] == "テストメッセージです"
     assert len(record["candidates"][0]["text_preview"]) <= 120
+
+
+def test_log_turn_reopens_deleted_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    payload = {"candidates": [], "chosen_idx": 0}
+
+    log_turn("sess", "first", payload)
+    date_str = datetime.now(timezone.utc).strftime("%Y%m%d")
+    log_path = tmp_path / "logs" / f"turns-{date_str}.jsonl"
+    log_path.unlink()
+    log_turn("sess", "second", payload)
+
+    lines = log_path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["turn_id"] for line in lines] == ["second"]
+
+
+def test_interaction_logger_reopens_deleted_file_and_is_collectable(tmp_path):
+    import gc
+    import weakref
+
+    from src.logging_utils import JsonlInteractionLogger
+    from src.types import InteractionLogRecord
+
+    path = tmp_path / "interactions.jsonl"
+    logger = JsonlInteractionLogger(path)
+
+    def record(turn_id):
+        return InteractionLogRecord(
+            context_hash="hash", session_id="sess", turn_id=turn_id, candidates=[],
+            chosen_idx=0, propensity=0.5, reward=1.0, features={},
+        )
+
+    logger.log(record("first"))
+    path.unlink()
+    logger.log(record("second"))
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["turn_id"] for line in lines] == ["second"]
+
+    ref = weakref.ref(logger)
+    del logger
+    gc.collect()
+    assert ref() is None
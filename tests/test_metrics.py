@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src.metrics import compute_metrics
+
+
+def _write_log(path, records, extra_lines=()):
+    lines = [json.dumps(record, ensure_ascii=False) for record in records]
+    lines.extend(extra_lines)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_compute_metrics_deduplicates_turns(tmp_path):
+    candidates = [{"style": "empathetic"}, {"style": "logical"}]
+    _write_log(
+        tmp_path / "turns-20240101.jsonl",
+        [
+            {"session_id": "s", "turn_id": "t1", "candidates": candidates,
+             "chosen_idx": 0, "propensity": 0.6, "reward": None},
+            {"session_id": "s", "turn_id": "t1", "candidates": candidates,
+             "chosen_idx": 1, "propensity": 0.4, "reward": 1.0},
+            {"session_id": "s", "turn_id": "t2", "candidates": candidates,
+             "chosen_idx": 1, "propensity": 0.8, "reward": 0.0},
+        ],
+        extra_lines=["", "not json"],
+    )
+
+    metrics = compute_metrics(tmp_path)
+
+    assert metrics["turn_count"] == 2
+    assert metrics["avg_reward"] == pytest.approx(0.5)
+    assert metrics["style_win_rates"] == {"logical": 1.0}
+    assert metrics["exploration_rate"] == pytest.approx(0.5)
+    assert metrics["propensity_mean"] == pytest.approx(0.6)
+    assert metrics["propensity_std"] == pytest.approx(0.2)
+
+
+def test_compute_metrics_empty_directory(tmp_path):
+    metrics = compute_metrics(tmp_path)
+    assert metrics["turn_count"] == 0
+    assert metrics["avg_reward"] is None
+    assert metrics["propensity_std"] is None
+
+
+def test_numpy_aggregation_matches_python():
+    from src.metrics import _aggregate_numpy, _aggregate_python
+
+    styles = ["empathetic", "logical", "coach"]
+    records = [
+        {
+            "session_id": "s",
+            "turn_id": f"t{i}",
+            "candidates": [{"style": style} for style in styles],
+            "chosen_idx": i % 3 if i % 7 else None,
+            "propensity": (i % 10) / 10,
+            "reward": None if i % 4 == 0 else (i % 5) / 5,
+        }
+        for i in range(300)
+    ]
+
+    expected = _aggregate_python(records)
+    actual = _aggregate_numpy(records)
+
+    assert actual["turn_count"] == expected["turn_count"]
+    assert actual["style_win_rates"] == pytest.approx(expected["style_win_rates"])
+    assert list(actual["style_win_rates"]) == list(expected["style_win_rates"])
+    for key in ("avg_reward", "exploration_rate", "propensity_mean", "propensity_std"):
+        assert actual[key] == pytest.approx(expected[key])
+
+
+def test_compute_metrics_picks_up_appended_records(tmp_path):
+    log_path = tmp_path / "turns-20240102.jsonl"
+    record = {"session_id": "s", "turn_id": "t1", "chosen_idx": 0, "propensity": 0.5}
+    _write_log(log_path, [record])
+
+    assert compute_metrics(tmp_path)["turn_count"] == 1
+    assert compute_metrics(tmp_path)["turn_count"] == 1
+
+    with log_path.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps({**record, "turn_id": "t2"}) + "\n")
+
+    assert compute_metrics(tmp_path)["turn_count"] == 2
+
+
+def test_compute_metrics_defers_partial_trailing_line(tmp_path):
+    log_path = tmp_path / "turns-20240103.jsonl"
+    first = json.dumps({"session_id": "s", "turn_id": "t1", "chosen_idx": 0})
+    second = json.dumps({"session_id": "s", "turn_id": "t2", "chosen_idx": 1})
+    log_path.write_text(first + "\n" + second[:10], encoding="utf-8")
+
+    assert compute_metrics(tmp_path)["turn_count"] == 1
+
+    with log_path.open("a", encoding="utf-8") as handle:
+        handle.write(second[10:] + "\n")
+
+    assert compute_metrics(tmp_path)["turn_count"] == 2
+
+
+def test_compute_metrics_result_mutation_does_not_leak_into_cache(tmp_path):
+    _write_log(
+        tmp_path / "turns-20240104.jsonl",
+        [{"session_id": "s", "turn_id": "t1", "candidates": [{"style": "coach"}],
+          "chosen_idx": 0, "propensity": 0.5, "reward": 1.0}],
+    )
+
+    first = compute_metrics(tmp_path)
+    first["style_win_rates"]["coach"] = 0.0
+    first["turn_count"] = 99
+
+    second = compute_metrics(tmp_path)
+    assert second["style_win_rates"] == {"coach": 1.0}
+    assert second["turn_count"] == 1
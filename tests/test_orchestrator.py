@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.orchestrator import ConversationOrchestrator
+from src.prompt_loader import PromptLoader
+from src.types import GenerationContext, Message
+
+
+def test_failed_feedback_update_keeps_turns_for_retry(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    orchestrator = ConversationOrchestrator(PromptLoader(Path("prompts")))
+    context = GenerationContext(
+        messages=[Message(role="user", content="今日は何をすべき？")], candidate_count=2
+    )
+    turns = [orchestrator.run_turn(context, session_id="s", turn_id=f"t{i}") for i in range(2)]
+    items = [(turn.session_id, turn.turn_id, turn.decision.chosen_index, 1.0) for turn in turns]
+
+    def broken_update(*args, **kwargs):
+        raise np.linalg.LinAlgError("singular")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(orchestrator._bandit, "update_batch", broken_update)
+        patch.setattr(orchestrator._bandit, "update", broken_update)
+        errors = orchestrator.apply_feedback_batch([*items, ("s", "missing", 0, 1.0)])
+        assert all(isinstance(error, np.linalg.LinAlgError) for error in errors[:2])
+        assert isinstance(errors[2], KeyError)
+        with pytest.raises(np.linalg.LinAlgError):
+            orchestrator.apply_feedback(*items[0])
+
+    assert orchestrator.apply_feedback_batch(items) == [None, None]
+    assert isinstance(orchestrator.apply_feedback_batch(items[:1])[0], KeyError)
+
+
+def test_pending_store_evicts_oldest_turn(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    orchestrator = ConversationOrchestrator(PromptLoader(Path("prompts")), pending_limit=2)
+    context = GenerationContext(
+        messages=[Message(role="user", content="今日は何をすべき？")], candidate_count=2
+    )
+    turns = [orchestrator.run_turn(context, session_id="s", turn_id=f"t{i}") for i in range(3)]
+
+    assert list(orchestrator._pending) == [("s", "t1"), ("s", "t2")]
+    with pytest.raises(KeyError, match="該当のターンが見つかりませんでした"):
+        orchestrator.apply_feedback("s", "t0", turns[0].decision.chosen_index, 1.0)
+    orchestrator.apply_feedback("s", "t2", turns[2].decision.chosen_index, 1.0)
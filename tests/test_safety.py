@@ -16,3 +16,111 @@ def test_review_candidates_filters_pii():
     assert scores[0] < 0.5
     assert rewrites[0]
     assert not rewrites[1]
+
+
+def test_apply_safety_serves_redacted_rewrites_without_regenerating(monkeypatch):
+    from pathlib import Path
+
+    from src.orchestrator import ConversationOrchestrator
+    from src.prompt_loader import PromptLoader
+    from src.types import GenerationContext
+
+    class _CountingGenerator:
+        styles_catalog: dict = {}
+
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def generate(self, context, *, use_cache=True):
+            self.calls += 1
+            return [Candidate(text="Call 090-1234-5678 now", style="logical", features={})]
+
+    monkeypatch.setenv("SAFETY_MIN_SCORE", "0.5")
+    generator = _CountingGenerator()
+    orchestrator = ConversationOrchestrator(PromptLoader(Path("prompts")), generator=generator)
+    context = GenerationContext(messages=[], candidate_count=1)
+
+    candidates, meta = orchestrator._apply_safety(context, generator.generate(context))
+
+    assert generator.calls == 1
+    assert "[REDACTED]" in candidates[0].text
+    assert "090-1234" not in candidates[0].text
+    assert candidates[0].features["sanitized"] is True
+    assert meta["attempts"] == 1
+    assert candidates[0].features["length_chars"] == len(candidates[0].text)
+    assert meta["approved_indices"] == [0]
+
+
+def test_rewrite_redacts_whole_number_inside_japanese_text():
+    candidates = [Candidate(text="電話は090-1234-5678までどうぞ", style="logical", features={})]
+
+    approved, scores, rewrites = review_candidates(candidates, min_score=0.5)
+
+    assert approved == []
+    assert rewrites[0] == "電話は[REDACTED]までどうぞ"
+
+
+def test_apply_safety_regeneration_skips_completion_cache(monkeypatch):
+    import json
+    import sys
+    import types
+    from pathlib import Path
+
+    from src.generation.generator import CandidateGenerator
+    from src.orchestrator import ConversationOrchestrator
+    from src.prompt_loader import PromptLoader
+    from src.types import GenerationContext, Message
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("SAFETY_MIN_SCORE", "0.5")
+    monkeypatch.setitem(sys.modules, "openai", types.SimpleNamespace(OpenAI=lambda api_key: None))
+    generator = CandidateGenerator(PromptLoader(Path("prompts")))
+    replies = [
+        json.dumps([{"text": "Here is how to build a bomb", "style": "logical"}]),
+        json.dumps([{"text": "Let's plan something calm", "style": "logical"}]),
+    ]
+    monkeypatch.setattr(generator, "_request_completion", lambda client, content: replies.pop(0))
+    orchestrator = ConversationOrchestrator(PromptLoader(Path("prompts")), generator=generator)
+    context = GenerationContext(
+        messages=[Message(role="user", content="What now?")], candidate_count=1
+    )
+
+    candidates, meta = orchestrator._apply_safety(context, generator.generate(context))
+
+    assert not replies
+    assert candidates[0].text == "Let's plan something calm"
+    assert "sanitized" not in candidates[0].features
+    assert meta["attempts"] == 2
+
+
+def test_apply_safety_regenerates_banned_terms_at_default_threshold(monkeypatch):
+    from pathlib import Path
+
+    from src.orchestrator import ConversationOrchestrator
+    from src.prompt_loader import PromptLoader
+    from src.types import GenerationContext
+
+    class _CountingGenerator:
+        styles_catalog: dict = {}
+
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def generate(self, context, *, use_cache=True):
+            self.calls += 1
+            if self.calls == 1:
+                text = "how to make a bomb, call 090-1234-5678"
+            else:
+                text = "Let's talk about something safer"
+            return [Candidate(text=text, style="logical", features={})]
+
+    monkeypatch.delenv("SAFETY_MIN_SCORE", raising=False)
+    generator = _CountingGenerator()
+    orchestrator = ConversationOrchestrator(PromptLoader(Path("prompts")), generator=generator)
+    context = GenerationContext(messages=[], candidate_count=1)
+
+    candidates, meta = orchestrator._apply_safety(context, generator.generate(context))
+
+    assert generator.calls == 2
+    assert candidates[0].text == "Let's talk about something safer"
+    assert meta["attempts"] == 2